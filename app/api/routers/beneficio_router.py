@@ -1,26 +1,44 @@
 """Router de beneficios - Endpoints REST"""
 
-from typing import Optional
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, Optional, Set
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, Query, Request, status, UploadFile, File, Form
+from fastapi.responses import ORJSONResponse
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schemas.beneficio_schema import (
     BeneficioResponse,
     BeneficioListResponse,
-    BeneficioSummaryResponse
+    BeneficioSummaryResponse,
+    beneficio_list_payload
 )
-from app.core.database import get_db
-from app.core.exceptions import BaseAppException, NotFoundError, ConflictError, ValidationError
+from app.core.cache import RedisDep, cached, invalidate
+from app.core.database import get_db, get_db_session
+from app.core.logger import get_logger
 from app.core.security import CurrentUser
-from app.core.utils.file_utils import file_manager
-from app.core.auth import get_current_user, require_admin, require_manage_benefits
+from app.core.utils.file_utils import FileManager, file_manager
+from app.core.utils.http_cache import json_with_etag
+from app.core.auth import CurrentUserDep, require_manage_benefits
 from app.repositories.beneficio_repository import BeneficioRepository
 from app.services.beneficio_service import BeneficioService
 
 
-router = APIRouter(prefix="/beneficios", tags=["beneficios"])
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/beneficios", tags=["beneficios"], default_response_class=ORJSONResponse)
+
+# Tiempos de vida (segundos) de las respuestas cacheadas
+BENEFICIO_CACHE_TTL = 300
+SUMMARY_CACHE_TTL = 60
+SEARCH_CACHE_TTL = 60
+
+# Referencias a tareas en segundo plano para que no sean recolectadas antes de terminar
+_background_tasks: Set[asyncio.Task] = set()
 
 
 def get_beneficio_service(db: AsyncSession = Depends(get_db)) -> BeneficioService:
@@ -28,7 +46,66 @@ def get_beneficio_service(db: AsyncSession = Depends(get_db)) -> BeneficioServic
     repository = BeneficioRepository(db)
     return BeneficioService(repository)
 
-#current_user: CurrentUser = Depends(require_manage_benefits),
+
+BeneficioServiceDep = Annotated[BeneficioService, Depends(get_beneficio_service)]
+# Misma sesión que usa el servicio (FastAPI resuelve get_db una vez por request)
+DbSessionDep = Annotated[AsyncSession, Depends(get_db)]
+BenefitsManagerDep = Annotated[CurrentUser, Depends(require_manage_benefits)]
+
+
+async def _fetch_beneficio_detached(beneficio_id: UUID) -> dict:
+    """Obtiene un beneficio con una sesión propia que libera la conexión al terminar la consulta"""
+    async with get_db_session() as session:
+        return await BeneficioService(BeneficioRepository(session)).get_beneficio_by_id(beneficio_id)
+
+
+async def _commit_and_invalidate(
+    db: AsyncSession,
+    cache: Optional[Redis],
+    beneficio_id: Optional[UUID] = None
+) -> None:
+    """
+    Confirma la escritura del request e invalida las respuestas cacheadas afectadas
+
+    El commit va primero: get_db confirma recién después de enviar la respuesta, y una lectura
+    concurrente entre la invalidación y ese commit volvería a cachear la fila anterior.
+    """
+    await db.commit()
+    keys = ["ben:summary"]
+    if beneficio_id is not None:
+        keys.append(f"ben:id:{beneficio_id}")
+    await invalidate(cache, keys=keys, patterns=("ben:list:*", "ben:search:*"))
+
+
+async def _delete_image_quietly(image_url: str) -> None:
+    """Elimina una imagen registrando el error en lugar de propagarlo"""
+    try:
+        await file_manager.delete_beneficio_image(image_url)
+    except Exception as exc:
+        logger.warning(
+            "No se pudo eliminar la imagen anterior",
+            extra={"extra_data": {"image_url": image_url, "error": str(exc)}}
+        )
+
+
+def _delete_image_in_background(image_url: str) -> None:
+    """Programa la eliminación de una imagen sin bloquear la respuesta"""
+    task = asyncio.create_task(_delete_image_quietly(image_url))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@asynccontextmanager
+async def _pending_image(fm: FileManager, upload: UploadFile) -> AsyncIterator[str]:
+    """Guarda la imagen y la elimina si el bloque falla"""
+    image_url = await fm.save_beneficio_image(upload)
+    try:
+        yield image_url
+    except BaseException:
+        await fm.delete_beneficio_image(image_url)
+        raise
+
+#current_user: BenefitsManagerDep,
 @router.post(
     "/",
     response_model=BeneficioResponse,
@@ -37,20 +114,18 @@ def get_beneficio_service(db: AsyncSession = Depends(get_db)) -> BeneficioServic
     description="Crea un nuevo beneficio con imagen. Requiere permisos de administrador."
 )
 async def create_beneficio(
+    service: BeneficioServiceDep,
+    db: DbSessionDep,
+    cache: RedisDep,
     imagen: UploadFile = File(..., description="Archivo de imagen del beneficio"),
     beneficio: str = Form(..., description="Nombre del beneficio"),
     detalle: str = Form(..., description="Descripción detallada"),
     valor: int = Form(..., ge=0, description="Valor en puntos"),
-    requiresJourney: bool = Form(..., description="Indica si requiere jornada específica"),
-    
-    service: BeneficioService = Depends(get_beneficio_service)
+    requiresJourney: bool = Form(..., description="Indica si requiere jornada específica")
 ) -> BeneficioResponse:
     """Crea un nuevo beneficio con imagen"""
-    try:
-        # Guardar la imagen y obtener la URL
-        image_url = await file_manager.save_beneficio_image(imagen)
-        
-        # Crear beneficio
+    # La imagen guardada se elimina si la creación falla
+    async with _pending_image(file_manager, imagen) as image_url:
         result = await service.create_beneficio(
             beneficio=beneficio,
             detalle=detalle,
@@ -58,30 +133,9 @@ async def create_beneficio(
             imagen=image_url,
             requiresJourney=requiresJourney
         )
-        
-        return BeneficioResponse(**result)
-        
-    except ConflictError as e:
-        # Si hay error, eliminar imagen guardada
-        if 'image_url' in locals():
-            await file_manager.delete_beneficio_image(image_url)
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except ValidationError as e:
-        # Si hay error, eliminar imagen guardada
-        if 'image_url' in locals():
-            await file_manager.delete_beneficio_image(image_url)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except Exception as e:
-        # Si hay error, eliminar imagen guardada
-        if 'image_url' in locals():
-            await file_manager.delete_beneficio_image(image_url)
-        raise
+        await _commit_and_invalidate(db, cache)
+    
+    return BeneficioResponse(**result)
 
 
 @router.get(
@@ -91,19 +145,21 @@ async def create_beneficio(
 )
 async def get_beneficio(
     beneficio_id: UUID,
-    current_user: CurrentUser = Depends(get_current_user),
-    service: BeneficioService = Depends(get_beneficio_service)
+    request: Request,
+    current_user: CurrentUserDep,
+    service: BeneficioServiceDep,
+    cache: RedisDep
 ) -> BeneficioResponse:
     """Obtiene un beneficio por ID"""
-    try:
-        result = await service.get_beneficio_by_id(beneficio_id)
-        return BeneficioResponse(**result)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    result = await cached(
+        cache,
+        f"ben:id:{beneficio_id}",
+        BENEFICIO_CACHE_TTL,
+        lambda: service.get_beneficio_by_id(beneficio_id)
+    )
+    # El navegador empieza a descargar la imagen mientras procesa el JSON
+    headers = {"Link": f'<{result["imagen"]}>; rel=preload; as=image'} if result.get("imagen") else None
+    return json_with_etag(request, BeneficioResponse(**result).model_dump(), headers=headers)
 
 
 @router.put(
@@ -114,42 +170,28 @@ async def get_beneficio(
 )
 async def update_beneficio(
     beneficio_id: UUID,
+    current_user: BenefitsManagerDep,
+    service: BeneficioServiceDep,
+    db: DbSessionDep,
+    cache: RedisDep,
     imagen: Optional[str] = Form(None),
     beneficio: Optional[str] = Form(None),
     detalle: Optional[str] = Form(None),
     valor: Optional[int] = Form(None, ge=0),
-    requiresJourney: Optional[bool] = Form(None),
-    current_user: CurrentUser = Depends(require_manage_benefits),
-    service: BeneficioService = Depends(get_beneficio_service)
+    requiresJourney: Optional[bool] = Form(None)
 ) -> BeneficioResponse:
     """Actualiza un beneficio"""
-    try:
-        result = await service.update_beneficio(
-            beneficio_id=beneficio_id,
-            imagen=imagen,
-            beneficio=beneficio,
-            detalle=detalle,
-            valor=valor,
-            requiresJourney=requiresJourney
-        )
-        
-        return BeneficioResponse(**result)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except ConflictError as e:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except ValidationError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    result = await service.update_beneficio(
+        beneficio_id=beneficio_id,
+        imagen=imagen,
+        beneficio=beneficio,
+        detalle=detalle,
+        valor=valor,
+        requiresJourney=requiresJourney
+    )
+    await _commit_and_invalidate(db, cache, beneficio_id)
+    
+    return BeneficioResponse(**result)
 
 
 @router.put(
@@ -159,41 +201,38 @@ async def update_beneficio(
 )
 async def update_beneficio_imagen(
     beneficio_id: UUID,
-    imagen: UploadFile = File(...),
-    current_user: CurrentUser = Depends(require_manage_benefits),
-    service: BeneficioService = Depends(get_beneficio_service)
+    current_user: BenefitsManagerDep,
+    service: BeneficioServiceDep,
+    db: DbSessionDep,
+    cache: RedisDep,
+    imagen: UploadFile = File(...)
 ) -> BeneficioResponse:
     """Actualiza solo la imagen de un beneficio"""
+    # Obtener beneficio actual mientras se guarda la nueva imagen; se usa una sesión
+    # aparte para que la del request no retenga una conexión del pool durante la subida
+    current_task = asyncio.create_task(_fetch_beneficio_detached(beneficio_id))
     try:
-        # Obtener beneficio actual para eliminar imagen anterior
-        current_beneficio = await service.get_beneficio_by_id(beneficio_id)
-        old_image_url = current_beneficio["imagen"]
-        
-        # Guardar nueva imagen
-        new_image_url = await file_manager.save_beneficio_image(imagen)
+        # La nueva imagen se elimina si la actualización falla
+        async with _pending_image(file_manager, imagen) as new_image_url:
+            current_beneficio = await current_task
+            old_image_url = current_beneficio["imagen"]
+            
+            result = await service.update_beneficio(
+                beneficio_id=beneficio_id,
+                imagen=new_image_url
+            )
+            await _commit_and_invalidate(db, cache, beneficio_id)
         
-        # Actualizar beneficio
-        result = await service.update_beneficio(
-            beneficio_id=beneficio_id,
-            imagen=new_image_url
-        )
-        
-        # Eliminar imagen anterior
+        # Eliminar imagen anterior en segundo plano
         if old_image_url:
-            await file_manager.delete_beneficio_image(old_image_url)
+            _delete_image_in_background(old_image_url)
         
         return BeneficioResponse(**result)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except Exception as e:
-        # Si hay error, eliminar nueva imagen
-        if 'new_image_url' in locals():
-            await file_manager.delete_beneficio_image(new_image_url)
-        raise
+    finally:
+        # Si falló la subida, no dejar la consulta corriendo
+        if not current_task.done():
+            current_task.cancel()
+            await asyncio.gather(current_task, return_exceptions=True)
 
 
 @router.put(
@@ -204,19 +243,15 @@ async def update_beneficio_imagen(
 )
 async def deactivate_beneficio(
     beneficio_id: UUID,
-    current_user: CurrentUser = Depends(require_manage_benefits),
-    service: BeneficioService = Depends(get_beneficio_service)
+    current_user: BenefitsManagerDep,
+    service: BeneficioServiceDep,
+    db: DbSessionDep,
+    cache: RedisDep
 ) -> BeneficioResponse:
     """Desactiva un beneficio"""
-    try:
-        result = await service.deactivate_beneficio(beneficio_id)
-        return BeneficioResponse(**result)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    result = await service.deactivate_beneficio(beneficio_id)
+    await _commit_and_invalidate(db, cache, beneficio_id)
+    return BeneficioResponse(**result)
 
 
 @router.put(
@@ -227,19 +262,15 @@ async def deactivate_beneficio(
 )
 async def activate_beneficio(
     beneficio_id: UUID,
-    current_user: CurrentUser = Depends(require_manage_benefits),
-    service: BeneficioService = Depends(get_beneficio_service)
+    current_user: BenefitsManagerDep,
+    service: BeneficioServiceDep,
+    db: DbSessionDep,
+    cache: RedisDep
 ) -> BeneficioResponse:
     """Activa un beneficio"""
-    try:
-        result = await service.activate_beneficio(beneficio_id)
-        return BeneficioResponse(**result)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    result = await service.activate_beneficio(beneficio_id)
+    await _commit_and_invalidate(db, cache, beneficio_id)
+    return BeneficioResponse(**result)
 
 
 @router.get(
@@ -249,32 +280,22 @@ async def activate_beneficio(
     description="Lista beneficios con paginación y filtros"
 )
 async def list_beneficios(
+    request: Request,
+    service: BeneficioServiceDep,
+    cache: RedisDep,
     page: int = Query(1, ge=1, description="Número de página"),
     size: int = Query(10, ge=1, le=100, description="Tamaño de página"),
-    is_active: Optional[bool] = Query(None, description="Filtrar por estado"),
-    service: BeneficioService = Depends(get_beneficio_service)
+    is_active: Optional[bool] = Query(None, description="Filtrar por estado")
 ) -> BeneficioListResponse:
     """Lista beneficios con paginación y filtros"""
-    try:
-        result = await service.list_beneficios(
-            page=page,
-            size=size,
-            is_active=is_active
-        )
-        
-        return BeneficioListResponse(
-            beneficios=[BeneficioResponse(**b) for b in result["beneficios"]],
-            total=result["total"],
-            page=result["page"],
-            size=result["size"],
-            total_pages=result["total_pages"]
-        )
-        
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    result = await cached(
+        cache,
+        f"ben:list:{page}:{size}:{is_active}",
+        BENEFICIO_CACHE_TTL,
+        lambda: service.list_beneficios(page=page, size=size, is_active=is_active)
+    )
+    
+    return json_with_etag(request, beneficio_list_payload(result))
 
 
 @router.get(
@@ -284,33 +305,25 @@ async def list_beneficios(
     description="Busca beneficios por texto en nombre, detalle o reglas"
 )
 async def search_beneficios(
+    current_user: CurrentUserDep,
+    service: BeneficioServiceDep,
+    cache: RedisDep,
     q: str = Query(..., min_length=2, description="Término de búsqueda"),
     page: int = Query(1, ge=1),
-    size: int = Query(10, ge=1, le=100),
-    current_user: CurrentUser = Depends(get_current_user),
-    service: BeneficioService = Depends(get_beneficio_service)
+    size: int = Query(10, ge=1, le=100)
 ) -> BeneficioListResponse:
     """Busca beneficios por texto"""
-    try:
-        result = await service.search_beneficios(
-            query=q,
-            page=page,
-            size=size
-        )
-        
-        return BeneficioListResponse(
-            beneficios=[BeneficioResponse(**b) for b in result["beneficios"]],
-            total=result["total"],
-            page=result["page"],
-            size=result["size"],
-            total_pages=result["total_pages"]
-        )
-        
-    except ValidationError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    # La búsqueda no distingue mayúsculas, así que "Gym" y "gym " comparten entrada
+    term = q.strip().lower()
+    term_hash = hashlib.blake2b(term.encode(), digest_size=16).hexdigest()
+    result = await cached(
+        cache,
+        f"ben:search:{term_hash}:{page}:{size}",
+        SEARCH_CACHE_TTL,
+        lambda: service.search_beneficios(query=term, page=page, size=size)
+    )
+    
+    return ORJSONResponse(beneficio_list_payload(result))
 
 
 @router.get(
@@ -320,9 +333,11 @@ async def search_beneficios(
     description="Obtiene estadísticas de beneficios"
 )
 async def get_summary(
-    current_user: CurrentUser = Depends(get_current_user),
-    service: BeneficioService = Depends(get_beneficio_service)
+    request: Request,
+    current_user: CurrentUserDep,
+    service: BeneficioServiceDep,
+    cache: RedisDep
 ) -> BeneficioSummaryResponse:
     """Obtiene resumen estadístico de beneficios"""
-    result = await service.get_summary()
-    return BeneficioSummaryResponse(**result)
+    result = await cached(cache, "ben:summary", SUMMARY_CACHE_TTL, service.get_summary)
+    return json_with_etag(request, BeneficioSummaryResponse(**result).model_dump())
@@ -1,29 +1,33 @@
 """Router de canjes - Endpoints REST para canje de puntos"""
 
-from typing import Optional
+from typing import Annotated, AsyncIterator, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schemas.canje_schema import (
     CanjeCreateRequest,
     CanjeResponse,
     CanjeListResponse,
-    CanjeEstadoUpdate
+    CanjeEstadoUpdate,
+    canje_list_payload
 )
 from app.core.database import get_db
-from app.core.exceptions import BaseAppException, NotFoundError, ValidationError
-from app.core.auth import get_current_user
-from app.core.security import CurrentUser
+from app.core.auth import CurrentUserDep
+from app.core.logger import get_logger
+from app.core.utils.http_cache import json_with_etag
 from app.repositories.canje_repository import CanjeRepository
 from app.repositories.user_repository import UserRepository
 from app.repositories.beneficio_repository import BeneficioRepository
-from app.services.user_service import UserService
 from app.services.canje_service import CanjeService
+from app.services.email_service import EmailService
 
-router = APIRouter(prefix="/canjes", tags=["canjes"])
+logger = get_logger(__name__)
 
+router = APIRouter(prefix="/canjes", tags=["canjes"], default_response_class=ORJSONResponse)
 
 def get_canje_service(db: AsyncSession = Depends(get_db)) -> CanjeService:
     """Dependencia para obtener el servicio de canjes"""
@@ -33,10 +37,26 @@ def get_canje_service(db: AsyncSession = Depends(get_db)) -> CanjeService:
     return CanjeService(canje_repository, user_repository, beneficio_repository)
 
 
-def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
-    """Dependencia para obtener el servicio de usuarios"""
-    user_repository = UserRepository(db)
-    return UserService(user_repository)
+CanjeServiceDep = Annotated[CanjeService, Depends(get_canje_service)]
+# Misma sesión que usa el servicio (FastAPI resuelve get_db una vez por request)
+DbSessionDep = Annotated[AsyncSession, Depends(get_db)]
+
+
+def _send_canje_notification(recipient_email: str, context: dict) -> None:
+    """Envía la notificación de canje registrando el error en lugar de propagarlo"""
+    try:
+        EmailService.send_benefit_notification(recipient_email=recipient_email, context=context)
+    except Exception as exc:
+        logger.error(
+            "No se pudo enviar la notificación de canje",
+            extra={"extra_data": {"recipient": recipient_email, "error": str(exc)}}
+        )
+
+
+async def _ndjson(rows: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Serializa cada canje como una línea JSON a medida que se lee"""
+    async for row in rows:
+        yield orjson.dumps(row) + b"\n"
 
 
 @router.post(
@@ -62,9 +82,10 @@ def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
 )
 async def crear_canje(
     request: CanjeCreateRequest,
-    # current_user: CurrentUser = Depends(get_current_user),
-    service: CanjeService = Depends(get_canje_service),
-    user_service: UserService = Depends(get_user_service)
+    background_tasks: BackgroundTasks,
+    # current_user: CurrentUserDep,
+    service: CanjeServiceDep,
+    db: DbSessionDep
 ) -> CanjeResponse:
     """
     Crea un nuevo canje de puntos por beneficio
@@ -72,45 +93,42 @@ async def crear_canje(
     Este endpoint valida todas las reglas de negocio y realiza el descuento
     automático de puntos al usuario
     """
-    try:
-        canje = await service.crear_canje(
-            user_id=request.user_id,
-            beneficio_id=request.beneficio_id,
-            puntos_utilizar=request.puntos_utilizar,
-            fecha_canje=request.fecha_canje,
-            fecha_uso=request.fecha_uso,
-            jornada=request.jornada,
-            observaciones=request.observaciones
-        )
-        # Notificación al usuario (delegada al servicio)
-        await service.send_canje_notification(
-            user_id=request.user_id,
-            beneficio_id=request.beneficio_id,
-            puntos_utilizados=request.puntos_utilizar,
-            fecha_canje=request.fecha_canje,
-            fecha_uso=request.fecha_uso,
-            jornada=canje.get("jornada"),
-            comentarios=request.observaciones,
-            puntos_restantes=canje.get("puntos_restantes")
-        )
-        
-        return CanjeResponse(**canje)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except ValidationError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
+    logger.debug(
+        "crear_canje payload uid=%s ben=%s pts=%s",
+        request.user_id, request.beneficio_id, request.puntos_utilizar
+    )
+    canje = await service.crear_canje(
+        user_id=request.user_id,
+        beneficio_id=request.beneficio_id,
+        puntos_utilizar=request.puntos_utilizar,
+        fecha_canje=request.fecha_canje,
+        fecha_uso=request.fecha_uso,
+        jornada=request.jornada,
+        observaciones=request.observaciones
+    )
+    # Notificación al usuario: el contexto se arma ahora y el envío SMTP se hace después de responder
+    notification = await service.build_canje_notification(
+        user_id=request.user_id,
+        beneficio_id=request.beneficio_id,
+        puntos_utilizados=request.puntos_utilizar,
+        fecha_canje=request.fecha_canje,
+        fecha_uso=request.fecha_uso,
+        jornada=canje.get("jornada"),
+        comentarios=request.observaciones,
+        puntos_restantes=canje.get("puntos_restantes")
+    )
+    # get_db confirma recién después de las tareas en segundo plano: se confirma aquí para que
+    # el canje no dependa del envío del correo ni retenga el bloqueo de puntos durante el SMTP
+    await db.commit()
+    if notification is not None:
+        recipient_email, context = notification
+        background_tasks.add_task(
+            _send_canje_notification,
+            recipient_email=recipient_email,
+            context=context
         )
+    
+    return CanjeResponse(**canje)
 
 
 @router.get(
@@ -121,24 +139,13 @@ async def crear_canje(
 )
 async def get_canje(
     canje_id: UUID,
-    current_user: CurrentUser = Depends(get_current_user),
-    service: CanjeService = Depends(get_canje_service)
+    request: Request,
+    current_user: CurrentUserDep,
+    service: CanjeServiceDep
 ) -> CanjeResponse:
     """Obtiene un canje por ID"""
-    try:
-        canje = await service.get_canje_by_id(canje_id)
-        return CanjeResponse(**canje)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    canje = await service.get_canje_by_id(canje_id)
+    return json_with_etag(request, CanjeResponse(**canje).model_dump())
 
 
 @router.get(
@@ -149,34 +156,21 @@ async def get_canje(
 )
 async def get_canjes_usuario(
     user_id: int,
+    current_user: CurrentUserDep,
+    service: CanjeServiceDep,
     page: int = Query(1, ge=1, description="Número de página"),
     size: int = Query(10, ge=1, le=100, description="Tamaño de página"),
-    estado: Optional[str] = Query(None, description="Filtrar por estado (ACTIVO, USADO, CANCELADO, VENCIDO)"),
-    current_user: CurrentUser = Depends(get_current_user),
-    service: CanjeService = Depends(get_canje_service)
+    estado: Optional[str] = Query(None, description="Filtrar por estado (ACTIVO, USADO, CANCELADO, VENCIDO)")
 ) -> CanjeListResponse:
     """Lista los canjes de un usuario con paginación y filtros"""
-    try:
-        result = await service.get_canjes_by_user(
-            user_id=user_id,
-            page=page,
-            size=size,
-            estado=estado
-        )
-        
-        return CanjeListResponse(
-            canjes=[CanjeResponse(**canje) for canje in result["canjes"]],
-            total=result["total"],
-            page=result["page"],
-            size=result["size"],
-            total_pages=result["total_pages"]
-        )
-        
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    result = await service.get_canjes_by_user(
+        user_id=user_id,
+        page=page,
+        size=size,
+        estado=estado
+    )
+    
+    return ORJSONResponse(canje_list_payload(result))
 
 
 @router.get(
@@ -186,37 +180,36 @@ async def get_canjes_usuario(
     description="Lista todos los canjes con paginación y filtros. Requiere autenticación."
 )
 async def list_canjes(
+    request: Request,
+    current_user: CurrentUserDep,
+    service: CanjeServiceDep,
     page: int = Query(1, ge=1, description="Número de página"),
     size: int = Query(10, ge=1, le=100, description="Tamaño de página"),
     user_id: Optional[int] = Query(None, description="Filtrar por user_id"),
     beneficio_id: Optional[UUID] = Query(None, description="Filtrar por beneficio_id (UUID)"),
     estado: Optional[str] = Query(None, description="Filtrar por estado"),
-    current_user: CurrentUser = Depends(get_current_user),
-    service: CanjeService = Depends(get_canje_service)
+    stream: bool = Query(False, description="Entrega los canjes como NDJSON (una línea por canje, sin totales)")
 ) -> CanjeListResponse:
     """Lista todos los canjes con paginación y filtros"""
-    try:
-        result = await service.list_canjes(
+    if stream:
+        rows = service.list_canjes_stream(
             page=page,
             size=size,
             user_id=user_id,
             beneficio_id=beneficio_id,
             estado=estado
         )
-        
-        return CanjeListResponse(
-            canjes=[CanjeResponse(**canje) for canje in result["canjes"]],
-            total=result["total"],
-            page=result["page"],
-            size=result["size"],
-            total_pages=result["total_pages"]
-        )
-        
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+        return StreamingResponse(_ndjson(rows), media_type="application/x-ndjson")
+    
+    result = await service.list_canjes(
+        page=page,
+        size=size,
+        user_id=user_id,
+        beneficio_id=beneficio_id,
+        estado=estado
+    )
+    
+    return json_with_etag(request, canje_list_payload(result))
 
 
 @router.patch(
@@ -238,30 +231,13 @@ async def list_canjes(
 async def actualizar_estado_canje(
     canje_id: UUID,
     request: CanjeEstadoUpdate,
-    current_user: CurrentUser = Depends(get_current_user),
-    service: CanjeService = Depends(get_canje_service)
+    current_user: CurrentUserDep,
+    service: CanjeServiceDep
 ) -> CanjeResponse:
     """Actualiza el estado de un canje"""
-    try:
-        canje = await service.actualizar_estado_canje(
-            canje_id=canje_id,
-            estado=request.estado,
-            observaciones=request.observaciones
-        )
-        return CanjeResponse(**canje)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except ValidationError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    canje = await service.actualizar_estado_canje(
+        canje_id=canje_id,
+        estado=request.estado,
+        observaciones=request.observaciones
+    )
+    return CanjeResponse(**canje)
@@ -2,7 +2,7 @@
 
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, Depends, Query
 
 from app.application.datawarehouse.services.colaboradores_service import colaboradores_service
 from app.application.datawarehouse.dto.colaboradores_dto import (
@@ -11,9 +11,9 @@ from app.application.datawarehouse.dto.colaboradores_dto import (
     ColaboradoresListResponseDTO,
     ColaboradorInfoDTO
 )
+from app.core.exceptions import NotFoundError
 from app.core.security import CurrentUser
 from app.infrastructure.auth import require_admin
-from app.infrastructure.datawarehouse.exceptions import DatawarehouseException
 
 
 router = APIRouter(prefix="/colaboradores", tags=["colaboradores"])
@@ -37,41 +37,35 @@ async def get_colaboradores(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Lista colaboradores con filtros opcionales. Requiere rol ADMIN"""
-    try:
-        filter_params = {
-            "empl_status": empl_status,
-            "user_id": user_id,
-            "national_id": national_id,
-            "first_name": first_name,
-            "last_name": last_name,
-            "correo_flesan": correo_flesan,
-            "centro_costo": centro_costo,
-            "external_cod_cargo": external_cod_cargo,
-            "external_cod_tipo_contrato": external_cod_tipo_contrato,
-            "np_lider": np_lider
-        }
-        
-        filters = {k: v for k, v in filter_params.items() if v is not None}
-        
-        result = await colaboradores_service.get_colaboradores(
-            filters=filters if filters else None,
-            order_by=order_by,
-            limit=limit,
-            offset=offset
-        )
-        
-        return ColaboradoresListResponseDTO(
-            data=result,
-            total_records=len(result),
-            limit=limit,
-            offset=offset,
-            filters_applied=filters if filters else None
-        )
-        
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    filter_params = {
+        "empl_status": empl_status,
+        "user_id": user_id,
+        "national_id": national_id,
+        "first_name": first_name,
+        "last_name": last_name,
+        "correo_flesan": correo_flesan,
+        "centro_costo": centro_costo,
+        "external_cod_cargo": external_cod_cargo,
+        "external_cod_tipo_contrato": external_cod_tipo_contrato,
+        "np_lider": np_lider
+    }
+    
+    filters = {k: v for k, v in filter_params.items() if v is not None}
+    
+    result = await colaboradores_service.get_colaboradores(
+        filters=filters if filters else None,
+        order_by=order_by,
+        limit=limit,
+        offset=offset
+    )
+    
+    return ColaboradoresListResponseDTO(
+        data=result,
+        total_records=len(result),
+        limit=limit,
+        offset=offset,
+        filters_applied=filters if filters else None
+    )
 
 
 @router.post("/query", response_model=ColaboradoresListResponseDTO, summary="Consulta avanzada")
@@ -80,31 +74,25 @@ async def query_colaboradores(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Consulta colaboradores con filtros avanzados (POST). Requiere rol ADMIN"""
-    try:
-        filters = None
-        if query_data.filters:
-            filters = query_data.filters.to_dict()
-        
-        result = await colaboradores_service.get_colaboradores(
-            filters=filters,
-            columns=query_data.columns,
-            order_by=query_data.order_by,
-            limit=query_data.limit,
-            offset=query_data.offset
-        )
-        
-        return ColaboradoresListResponseDTO(
-            data=result,
-            total_records=len(result),
-            limit=query_data.limit,
-            offset=query_data.offset,
-            filters_applied=filters
-        )
-        
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    filters = None
+    if query_data.filters:
+        filters = query_data.filters.to_dict()
+    
+    result = await colaboradores_service.get_colaboradores(
+        filters=filters,
+        columns=query_data.columns,
+        order_by=query_data.order_by,
+        limit=query_data.limit,
+        offset=query_data.offset
+    )
+    
+    return ColaboradoresListResponseDTO(
+        data=result,
+        total_records=len(result),
+        limit=query_data.limit,
+        offset=query_data.offset,
+        filters_applied=filters
+    )
 
 
 @router.get("/user/{user_id}", summary="Obtener por user_id")
@@ -113,18 +101,10 @@ async def get_colaborador_by_user_id(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Obtiene un colaborador específico por user_id. Requiere rol ADMIN"""
-    try:
-        result = await colaboradores_service.get_colaborador_by_user_id(user_id)
-        if not result:
-            raise HTTPException(status_code=404, detail=f"Colaborador con user_id {user_id} no encontrado")
-        return result
-        
-    except HTTPException:
-        raise
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    result = await colaboradores_service.get_colaborador_by_user_id(user_id)
+    if not result:
+        raise NotFoundError(f"Colaborador con user_id {user_id} no encontrado")
+    return result
 
 
 @router.get("/national-id/{national_id}", summary="Obtener por cédula")
@@ -133,18 +113,10 @@ async def get_colaborador_by_national_id(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Obtiene un colaborador específico por cédula nacional. Requiere rol ADMIN"""
-    try:
-        result = await colaboradores_service.get_colaborador_by_national_id(national_id)
-        if not result:
-            raise HTTPException(status_code=404, detail=f"Colaborador con cédula {national_id} no encontrado")
-        return result
-        
-    except HTTPException:
-        raise
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    result = await colaboradores_service.get_colaborador_by_national_id(national_id)
+    if not result:
+        raise NotFoundError(f"Colaborador con cédula {national_id} no encontrado")
+    return result
 
 
 @router.get("/activos", response_model=ColaboradoresListResponseDTO, summary="Colaboradores activos")
@@ -154,22 +126,17 @@ async def get_colaboradores_activos(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Lista colaboradores con estado activo. Requiere rol ADMIN"""
-    try:
-        result = await colaboradores_service.get_colaboradores_activos(
-            limit=limit,
-            offset=offset
-        )
-        return ColaboradoresListResponseDTO(
-            data=result,
-            total_records=len(result),
-            limit=limit,
-            offset=offset,
-            filters_applied={"empl_status": "A"}
-        )
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    result = await colaboradores_service.get_colaboradores_activos(
+        limit=limit,
+        offset=offset
+    )
+    return ColaboradoresListResponseDTO(
+        data=result,
+        total_records=len(result),
+        limit=limit,
+        offset=offset,
+        filters_applied={"empl_status": "A"}
+    )
 
 
 @router.get("/centro-costo/{centro_costo}", response_model=ColaboradoresListResponseDTO, summary="Por centro de costo")
@@ -180,23 +147,18 @@ async def get_colaboradores_by_centro_costo(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Lista colaboradores por centro de costo. Requiere rol ADMIN"""
-    try:
-        result = await colaboradores_service.get_colaboradores_by_centro_costo(
-            centro_costo=centro_costo,
-            limit=limit,
-            offset=offset
-        )
-        return ColaboradoresListResponseDTO(
-            data=result,
-            total_records=len(result),
-            limit=limit,
-            offset=offset,
-            filters_applied={"centro_costo": centro_costo}
-        )
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    result = await colaboradores_service.get_colaboradores_by_centro_costo(
+        centro_costo=centro_costo,
+        limit=limit,
+        offset=offset
+    )
+    return ColaboradoresListResponseDTO(
+        data=result,
+        total_records=len(result),
+        limit=limit,
+        offset=offset,
+        filters_applied={"centro_costo": centro_costo}
+    )
 
 
 @router.get("/lider/{np_lider}", response_model=ColaboradoresListResponseDTO, summary="Por líder")
@@ -207,23 +169,18 @@ async def get_colaboradores_by_lider(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Lista colaboradores por líder. Requiere rol ADMIN"""
-    try:
-        result = await colaboradores_service.get_colaboradores_by_lider(
-            np_lider=np_lider,
-            limit=limit,
-            offset=offset
-        )
-        return ColaboradoresListResponseDTO(
-            data=result,
-            total_records=len(result),
-            limit=limit,
-            offset=offset,
-            filters_applied={"np_lider": np_lider}
-        )
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    result = await colaboradores_service.get_colaboradores_by_lider(
+        np_lider=np_lider,
+        limit=limit,
+        offset=offset
+    )
+    return ColaboradoresListResponseDTO(
+        data=result,
+        total_records=len(result),
+        limit=limit,
+        offset=offset,
+        filters_applied={"np_lider": np_lider}
+    )
 
 
 @router.post("/search", response_model=ColaboradoresListResponseDTO, summary="Buscar por nombre")
@@ -232,32 +189,22 @@ async def search_colaboradores_by_name(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Busca colaboradores por nombre. Requiere rol ADMIN"""
-    try:
-        result = await colaboradores_service.search_colaboradores_by_name(
-            search_term=search_data.search_term,
-            limit=search_data.limit,
-            offset=search_data.offset
-        )
-        return ColaboradoresListResponseDTO(
-            data=result,
-            total_records=len(result),
-            limit=search_data.limit,
-            offset=search_data.offset,
-            filters_applied={"search_term": search_data.search_term}
-        )
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    result = await colaboradores_service.search_colaboradores_by_name(
+        search_term=search_data.search_term,
+        limit=search_data.limit,
+        offset=search_data.offset
+    )
+    return ColaboradoresListResponseDTO(
+        data=result,
+        total_records=len(result),
+        limit=search_data.limit,
+        offset=search_data.offset,
+        filters_applied={"search_term": search_data.search_term}
+    )
 
 
 @router.get("/info", response_model=ColaboradorInfoDTO, summary="Información de la tabla")
 async def get_colaboradores_info(current_user: CurrentUser = Depends(require_admin)):
     """Obtiene información de la tabla de colaboradores. Requiere rol ADMIN"""
-    try:
-        result = await colaboradores_service.get_table_info()
-        return ColaboradorInfoDTO(**result)
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    result = await colaboradores_service.get_table_info()
+    return ColaboradorInfoDTO(**result)
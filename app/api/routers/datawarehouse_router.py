@@ -2,12 +2,11 @@
 
 from typing import Dict, List, Any, Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
 # TODO: Migrar servicios de datawarehouse
 # from app.application.datawarehouse.services.datawarehouse_service import datawarehouse_service
-# from app.infrastructure.datawarehouse.exceptions import DatawarehouseException
 
 from app.core.config import settings
 from app.core.security import CurrentUser
@@ -37,11 +36,8 @@ class TableQueryRequest(BaseModel):
 @router.get("/test-connection", summary="Probar conexión al datawarehouse")
 async def test_connection(current_user: CurrentUser = Depends(require_admin)):
     """Prueba la conexión al datawarehouse. Requiere rol ADMIN"""
-    try:
-        result = await datawarehouse_service.test_connection()
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    result = await datawarehouse_service.test_connection()
+    return result
 
 
 @router.get("/config-info", summary="Información de configuración")
@@ -62,13 +58,8 @@ async def get_config_info(current_user: CurrentUser = Depends(require_admin)):
 @router.get("/schemas", summary="Listar esquemas disponibles")
 async def get_schemas(current_user: CurrentUser = Depends(require_admin)):
     """Obtiene lista de esquemas disponibles. Requiere rol ADMIN"""
-    try:
-        schemas = await datawarehouse_service.get_available_schemas()
-        return {"schemas": schemas}
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    schemas = await datawarehouse_service.get_available_schemas()
+    return {"schemas": schemas}
 
 
 @router.get("/schemas/{schema}/tables", summary="Listar tablas de un esquema")
@@ -77,13 +68,8 @@ async def get_tables(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Obtiene tablas de un esquema. Requiere rol ADMIN"""
-    try:
-        tables = await datawarehouse_service.get_schema_tables(schema)
-        return {"schema": schema, "tables": tables}
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    tables = await datawarehouse_service.get_schema_tables(schema)
+    return {"schema": schema, "tables": tables}
 
 
 @router.get("/schemas/{schema}/tables/{table}", summary="Estructura de tabla")
@@ -93,13 +79,8 @@ async def get_table_structure(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Obtiene estructura de una tabla. Requiere rol ADMIN"""
-    try:
-        structure = await datawarehouse_service.get_table_structure(schema, table)
-        return structure
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    structure = await datawarehouse_service.get_table_structure(schema, table)
+    return structure
 
 
 @router.post("/query/custom", summary="Ejecutar query personalizada")
@@ -112,19 +93,14 @@ async def execute_custom_query(
     Requiere rol ADMIN.
     Restricción: Solo queries SELECT
     """
-    try:
-        result = await datawarehouse_service.execute_custom_query(
-            query=request.query,
-            parameters=request.parameters
-        )
-        return {
-            "data": result,
-            "total_rows": len(result)
-        }
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    result = await datawarehouse_service.execute_custom_query(
+        query=request.query,
+        parameters=request.parameters
+    )
+    return {
+        "data": result,
+        "total_rows": len(result)
+    }
 
 
 @router.post("/query/table", summary="Consultar tabla")
@@ -133,21 +109,16 @@ async def query_table(
     current_user: CurrentUser = Depends(require_admin)
 ):
     """Consulta una tabla específica del datawarehouse. Requiere rol ADMIN"""
-    try:
-        result = await datawarehouse_service.query_table(
-            schema=request.schema,
-            table=request.table,
-            columns=request.columns,
-            filters=request.filters,
-            order_by=request.order_by,
-            limit=request.limit,
-            offset=request.offset
-        )
-        return {
-            "data": result,
-            "total_rows": len(result)
-        }
-    except DatawarehouseException as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    result = await datawarehouse_service.query_table(
+        schema=request.schema,
+        table=request.table,
+        columns=request.columns,
+        filters=request.filters,
+        order_by=request.order_by,
+        limit=request.limit,
+        offset=request.offset
+    )
+    return {
+        "data": result,
+        "total_rows": len(result)
+    }
@@ -1,31 +1,54 @@
 """Router de health check"""
 
-from datetime import datetime
+import time
+from datetime import datetime, timezone
+from typing import Tuple
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db_session
 
 
 router = APIRouter(tags=["health"])
 
+# Segundos durante los que se reutiliza el último resultado del ping a la base de datos
+HEALTH_CACHE_TTL = 2.0
 
-@router.get("/health/")
-async def health_check(db: AsyncSession = Depends(get_db)):
-    """Endpoint de health check"""
-    # Verificar conexión a base de datos
+# (instante monotónico del último chequeo, respuesta)
+_last_check: Tuple[float, dict] = (float("-inf"), {})
+
+
+async def _check_database() -> str:
+    """Hace un SELECT 1 con una conexión del pool y retorna el estado"""
     try:
-        result = await db.execute(text("SELECT 1"))
-        db_status = "connected"
+        async with get_db_session() as db:
+            await db.execute(text("SELECT 1"))
+        return "connected"
     except Exception as e:
-        db_status = f"error: {str(e)}"
-    
-    return {
+        return f"error: {str(e)}"
+
+
+@router.get("/health/")
+async def health_check():
+    """
+    Endpoint de health check
+
+    El resultado se reutiliza por HEALTH_CACHE_TTL segundos para que las sondas de
+    liveness/readiness no generen una consulta a la base de datos en cada llamada.
+    """
+    global _last_check
+    checked_at, response = _last_check
+    if time.monotonic() - checked_at < HEALTH_CACHE_TTL:
+        return response
+
+    db_status = await _check_database()
+    response = {
         "status": "healthy" if db_status == "connected" else "unhealthy",
-        "timestamp": datetime.utcnow(),
+        "timestamp": datetime.now(timezone.utc),
         "version": settings.VERSION,
         "database": db_status
     }
+    _last_check = (time.monotonic(), response)
+    return response
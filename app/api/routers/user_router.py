@@ -3,24 +3,27 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schemas.user_schema import (
     UserCreateRequest,
     UserUpdateRequest,
     UserResponse,
-    UserListResponse
+    UserListResponse,
+    user_list_payload,
+    user_payload
 )
 from app.core.database import get_db
-from app.core.exceptions import BaseAppException, NotFoundError, ConflictError, ValidationError
 from app.core.security import CurrentUser
 from app.core.auth import get_current_user, require_admin
+from app.core.utils.http_cache import json_with_last_modified
 from app.repositories.user_repository import UserRepository
 from app.services.user_service import UserService
 
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], default_response_class=ORJSONResponse)
 
 
 def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
@@ -29,6 +32,15 @@ def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
     return UserService(repository)
 
 
+def _user_response(request: Request, user: dict) -> Response:
+    """Responde un usuario con Last-Modified, o 304 si el cliente ya tiene esa versión"""
+    return json_with_last_modified(
+        request,
+        user["updated_at"] or user["created_at"],
+        lambda: user_payload(user)
+    )
+
+
 @router.post(
     "/",
     response_model=UserResponse,
@@ -42,30 +54,13 @@ async def create_user(
     service: UserService = Depends(get_user_service)
 ) -> UserResponse:
     """Crea un nuevo usuario"""
-    try:
-        user = await service.create_user(
-            email=request.email,
-            first_name=request.first_name,
-            last_name=request.last_name,
-            roles=request.roles
-        )
-        return UserResponse(**user)
-        
-    except ConflictError as e:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except ValidationError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    user = await service.create_user(
+        email=request.email,
+        first_name=request.first_name,
+        last_name=request.last_name,
+        roles=request.roles
+    )
+    return ORJSONResponse(user_payload(user), status_code=status.HTTP_201_CREATED)
 
 
 @router.get(
@@ -75,24 +70,13 @@ async def create_user(
 )
 async def get_user(
     user_id:int,
+    request: Request,
     current_user: CurrentUser = Depends(get_current_user),
     service: UserService = Depends(get_user_service)
 ) -> UserResponse:
     """Obtiene un usuario por ID interno (UUID)"""
-    try:
-        user = await service.get_user_by_id(user_id)
-        return UserResponse(**user)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    user = await service.get_user_by_id(user_id)
+    return _user_response(request, user)
 
 
 @router.get(
@@ -103,24 +87,13 @@ async def get_user(
 )
 async def get_user_by_user_id(
     user_id: int,
+    request: Request,
     current_user: CurrentUser = Depends(get_current_user),
     service: UserService = Depends(get_user_service)
 ) -> UserResponse:
     """Obtiene un usuario por user_id del datawarehouse"""
-    try:
-        user = await service.get_user_by_user_id(user_id)
-        return UserResponse(**user)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    user = await service.get_user_by_user_id(user_id)
+    return _user_response(request, user)
 
 
 @router.put(
@@ -135,35 +108,13 @@ async def update_user(
     service: UserService = Depends(get_user_service)
 ) -> UserResponse:
     """Actualiza un usuario"""
-    try:
-        user = await service.update_user(
-            user_id=user_id,
-            first_name=request.first_name,
-            last_name=request.last_name,
-            email=request.email
-        )
-        return UserResponse(**user)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except ConflictError as e:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except ValidationError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    user = await service.update_user(
+        user_id=user_id,
+        first_name=request.first_name,
+        last_name=request.last_name,
+        email=request.email
+    )
+    return ORJSONResponse(user_payload(user))
 
 
 @router.delete(
@@ -178,20 +129,8 @@ async def deactivate_user(
     service: UserService = Depends(get_user_service)
 ) -> UserResponse:
     """Desactiva un usuario"""
-    try:
-        user = await service.deactivate_user(user_id)
-        return UserResponse(**user)
-        
-    except NotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    user = await service.deactivate_user(user_id)
+    return ORJSONResponse(user_payload(user))
 
 
 @router.get(
@@ -205,64 +144,40 @@ async def list_users(
     size: int = Query(10, ge=1, le=100, description="Tamaño de página"),
     email: Optional[str] = Query(None, description="Filtrar por email"),
     is_active: Optional[bool] = Query(None, description="Filtrar por estado"),
+    after_id: Optional[int] = Query(None, ge=0, description="Cursor keyset: user_id del último elemento recibido (reemplaza a page)"),
     current_user: CurrentUser = Depends(get_current_user),
     service: UserService = Depends(get_user_service)
 ) -> UserListResponse:
     """Lista usuarios con paginación y filtros"""
-    try:
-        result = await service.list_users(
-            page=page,
-            size=size,
-            email=email,
-            is_active=is_active
-        )
-        
-        return UserListResponse(
-            users=[UserResponse(**user) for user in result["users"]],
-            total=result["total"],
-            page=result["page"],
-            size=result["size"],
-            total_pages=result["total_pages"]
-        )
-        
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    result = await service.list_users(
+        page=page,
+        size=size,
+        email=email,
+        is_active=is_active,
+        after_id=after_id
+    )
+    return ORJSONResponse(user_list_payload(result))
 
 
 @router.get(
     "/search/",
     response_model=UserListResponse,
     summary="Buscar usuarios",
-    description="Busca usuarios por email"
+    description="Busca usuarios por email, nombre o apellido; varias palabras deben coincidir todas"
 )
 async def search_users(
     q: str = Query(..., min_length=2, description="Término de búsqueda"),
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
+    after_id: Optional[int] = Query(None, ge=0, description="Cursor keyset: user_id del último elemento recibido"),
     # current_user: CurrentUser = Depends(get_current_user),
     service: UserService = Depends(get_user_service)
 ) -> UserListResponse:
-    """Busca usuarios por email"""
-    try:
-        result = await service.search_users(
-            query=q,
-            page=page,
-            size=size
-        )
-        
-        return UserListResponse(
-            users=[UserResponse(**user) for user in result["users"]],
-            total=result["total"],
-            page=result["page"],
-            size=result["size"],
-            total_pages=result["total_pages"]
-        )
-        
-    except BaseAppException as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"message": e.message, "error_code": e.error_code}
-        )
+    """Busca usuarios por email, nombre o apellido"""
+    result = await service.search_users(
+        query=q,
+        page=page,
+        size=size,
+        after_id=after_id
+    )
+    return ORJSONResponse(user_list_payload(result))
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 
 class BeneficioCreateRequest(BaseModel):
@@ -14,14 +14,15 @@ class BeneficioCreateRequest(BaseModel):
     valor: int = Field(..., ge=0, description="Valor en puntos")
     requiresJourney: bool = Field(..., description="Indica si el beneficio requiere jornada específica")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "beneficio": "Día Cambio de Casa",
                 "detalle": "Un día libre para tu cambio de casa",
                 "valor": 350
             }
         }
+    )
 
 
 class BeneficioUpdateRequest(BaseModel):
@@ -45,8 +46,7 @@ class BeneficioResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BeneficioListResponse(BaseModel):
@@ -63,3 +63,19 @@ class BeneficioSummaryResponse(BaseModel):
     total_beneficios: int
     beneficios_activos: int
     valor_total: int
+
+
+# Validador compilado una sola vez para las listas de beneficios
+_BEN_LIST_ADAPTER = TypeAdapter(List[BeneficioResponse])
+
+
+def beneficio_list_payload(result: dict) -> dict:
+    """Arma el cuerpo de BeneficioListResponse validando las filas en una sola pasada (listo para orjson)"""
+    beneficios = _BEN_LIST_ADAPTER.validate_python(result["beneficios"])
+    return {
+        "beneficios": _BEN_LIST_ADAPTER.dump_python(beneficios),
+        "total": result["total"],
+        "page": result["page"],
+        "size": result["size"],
+        "total_pages": result["total_pages"]
+    }
@@ -1,10 +1,14 @@
 """Esquemas Pydantic para validación de canjes de puntos"""
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+
+
+# Estados posibles de un canje (conjunto cerrado: se valida por igualdad, sin regex)
+EstadoCanje = Literal["ACTIVO", "USADO", "CANCELADO", "VENCIDO"]
 
 
 class CanjeCreateRequest(BaseModel):
@@ -25,8 +29,8 @@ class CanjeCreateRequest(BaseModel):
             raise ValueError('La fecha de uso debe ser posterior a la fecha de canje')
         return v
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "user_id": 6070,
                 "beneficio_id": "8f3d0a8c-9a5b-4c2e-9b1e-1a2b3c4d5e6f",
@@ -37,6 +41,7 @@ class CanjeCreateRequest(BaseModel):
                 "observaciones": "Canje para día libre"
             }
         }
+    )
 
 
 class CanjeResponse(BaseModel):
@@ -54,8 +59,7 @@ class CanjeResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CanjeListResponse(BaseModel):
@@ -69,13 +73,30 @@ class CanjeListResponse(BaseModel):
 
 class CanjeEstadoUpdate(BaseModel):
     """Esquema para actualizar el estado de un canje"""
-    estado: str = Field(..., pattern="^(ACTIVO|USADO|CANCELADO|VENCIDO)$")
+    estado: EstadoCanje
     observaciones: Optional[str] = Field(None, max_length=500)
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "estado": "USADO",
                 "observaciones": "Beneficio utilizado correctamente"
             }
         }
+    )
+
+
+# Validador compilado una sola vez para las listas de canjes
+_CANJE_LIST_ADAPTER = TypeAdapter(List[CanjeResponse])
+
+
+def canje_list_payload(result: dict) -> dict:
+    """Arma el cuerpo de CanjeListResponse validando las filas en una sola pasada (listo para orjson)"""
+    canjes = _CANJE_LIST_ADAPTER.validate_python(result["canjes"])
+    return {
+        "canjes": _CANJE_LIST_ADAPTER.dump_python(canjes),
+        "total": result["total"],
+        "page": result["page"],
+        "size": result["size"],
+        "total_pages": result["total_pages"]
+    }
@@ -1,23 +1,28 @@
 """Esquemas Pydantic para validación de usuarios"""
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, TypeAdapter
 
 from app.core.security import Role
+from app.core.utils.validation import EMAIL_PATTERN
+
+
+# Validación sintáctica del email con una regex compilada (sin email-validator)
+EmailField = Annotated[str, StringConstraints(strip_whitespace=True, max_length=254, pattern=EMAIL_PATTERN)]
 
 
 class UserCreateRequest(BaseModel):
     """Esquema para crear usuario"""
-    email: EmailStr
+    email: EmailField
     first_name: str = Field(..., min_length=1, max_length=100)
     last_name: str = Field(..., min_length=1, max_length=100)
     role: Role = Field(default=Role.USER)
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "email": "usuario@ejemplo.com",
                 "first_name": "Juan",
@@ -25,13 +30,14 @@ class UserCreateRequest(BaseModel):
                 "role": "USER"
             }
         }
+    )
 
 
 class UserUpdateRequest(BaseModel):
     """Esquema para actualizar usuario"""
     first_name: Optional[str] = Field(None, min_length=1, max_length=100)
     last_name: Optional[str] = Field(None, min_length=1, max_length=100)
-    email: Optional[EmailStr] = None
+    email: Optional[EmailField] = None
     role: Optional[Role] = None
 
 
@@ -51,14 +57,36 @@ class UserResponse(BaseModel):
     updated_at: Optional[datetime] = None
     last_login: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserListResponse(BaseModel):
     """Esquema de respuesta para lista de usuarios"""
     users: List[UserResponse]
-    total: int
+    total: Optional[int] = None  # None en paginación keyset (no se cuenta)
     page: int
     size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[int] = None  # after_id de la página siguiente (paginación keyset)
+
+
+# Validador compilado una sola vez para las listas de usuarios
+_USER_LIST_ADAPTER = TypeAdapter(List[UserResponse])
+
+
+def user_payload(user: dict) -> dict:
+    """Valida un usuario del repositorio contra UserResponse y lo deja listo para orjson"""
+    return UserResponse.model_validate(user).model_dump(mode="json")
+
+
+def user_list_payload(result: dict) -> dict:
+    """Arma el cuerpo de UserListResponse validando las filas en una sola pasada (listo para orjson)"""
+    users = _USER_LIST_ADAPTER.validate_python(result["users"])
+    return {
+        "users": _USER_LIST_ADAPTER.dump_python(users),
+        "total": result["total"],
+        "page": result["page"],
+        "size": result["size"],
+        "total_pages": result["total_pages"],
+        "next_cursor": result["next_cursor"]
+    }
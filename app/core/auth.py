@@ -1,9 +1,13 @@
 """Funciones de autenticación y autorización"""
 
-from typing import Optional, Callable
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Annotated, Dict, Optional, Callable, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 
 from app.core.config import settings
 from app.core.exceptions import AuthenticationError, AuthorizationError
@@ -14,6 +18,92 @@ from app.core.logger import get_logger
 security = HTTPBearer(auto_error=False)
 logger = get_logger(__name__)
 
+# Caché token -> usuario para no decodificar el mismo JWT en cada petición
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_MAXSIZE = 4096
+# hash del token -> (expira_en, usuario); el orden de inserción/uso implementa el LRU
+_token_cache: "OrderedDict[bytes, Tuple[float, CurrentUser]]" = OrderedDict()
+
+# Clave HMAC construida una sola vez: con el secreto en texto jose la reconstruye (e intenta
+# parsearla como JWK) en cada decode
+_JWT_KEY = jwk.construct(settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+_JWT_ALGORITHMS = (settings.ALGORITHM,)
+
+# Rol del claim "rol" -> Role, y permisos de cada rol, resueltos con una sola búsqueda
+_ROLE_BY_NAME = {role.value: role for role in Role}
+_DEFAULT_ROLE = Role.USER
+_PERMS_BY_ROLE = {role: ROLE_PERMISSIONS.get(role, frozenset()) for role in Role}
+
+# Usuario de desarrollo por defecto para el bypass sin token; CurrentUser es inmutable, se comparte
+_DEV_USER: Optional[CurrentUser] = CurrentUser(
+    id="dev-user-uuid-12345",
+    user_id=None,  # ID del datawarehouse (opcional)
+    email="dev@flesan.com",
+    first_name="Dev",
+    last_name="User",
+    puntos_disponibles=0,
+    rol=Role.ADMIN,
+    permissions=ROLE_PERMISSIONS[Role.ADMIN],
+    is_active=True
+) if settings.ENVIRONMENT == "development" else None
+
+
+def _user_from_token(token: str) -> CurrentUser:
+    """
+    Decodifica el JWT y construye el usuario, reutilizando el resultado por TOKEN_CACHE_TTL segundos
+
+    Una entrada nunca sobrevive al `exp` del token. Lanza JWTError o AuthenticationError si es inválido.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.time()
+
+    hit = _token_cache.get(key)
+    if hit is not None:
+        expires_at, user = hit
+        if now < expires_at:
+            _token_cache.move_to_end(key)
+            return user
+        del _token_cache[key]
+
+    # Un JWS compacto tiene exactamente tres segmentos; se descarta sin calcular el HMAC
+    if token.count(".") != 2:
+        raise JWTError("Token mal formado")
+
+    payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
+    
+    user_id: str = payload.get("sub")  # 
+    email: str = payload.get("email")
+    rol_str: str = payload.get("rol", "user")
+    
+    if user_id is None or email is None:
+        raise AuthenticationError("Token inválido")
+    
+    # Convertir string de rol a enum Role (USER por defecto si no es válido)
+    rol = _ROLE_BY_NAME.get(rol_str.lower() if isinstance(rol_str, str) else "", _DEFAULT_ROLE)
+    
+    # Obtener permisos según el rol
+    permissions = _PERMS_BY_ROLE[rol]
+    
+    user = CurrentUser(
+        id=user_id,
+        user_id=payload.get("user_id"),  # ID del datawarehouse
+        email=email,
+        first_name=payload.get("first_name", ""),
+        last_name=payload.get("last_name", ""),
+        puntos_disponibles=payload.get("puntos_disponibles", 0),
+        rol=rol,
+        permissions=permissions,
+        is_active=payload.get("is_active", True)
+    )
+
+    expires_at = now + TOKEN_CACHE_TTL
+    if payload.get("exp") is not None:
+        expires_at = min(expires_at, float(payload["exp"]))
+    _token_cache[key] = (expires_at, user)
+    if len(_token_cache) > TOKEN_CACHE_MAXSIZE:
+        _token_cache.popitem(last=False)
+    return user
+
 
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
@@ -27,25 +117,8 @@ async def get_current_user(
     """
 
     # Bypass de autenticación en desarrollo (solo para testing)
-    if settings.ENVIRONMENT == "development" and credentials is None:
-        # Usuario de desarrollo por defecto
-        return CurrentUser(
-            id="dev-user-uuid-12345",
-            user_id=None,  # ID del datawarehouse (opcional)
-            email="dev@flesan.com",
-            first_name="Dev",
-            last_name="User",
-            puntos_disponibles=0,
-            rol=Role.ADMIN,
-            permissions=ROLE_PERMISSIONS[Role.ADMIN],
-            is_active=True
-        )
-    logger.debug(
-            {"Token": request.cookies.get("user_token"),
-            "Secret": settings.SECRET_KEY,
-            "Algorithm": settings.ALGORITHM
-            }
-        )
+    if _DEV_USER is not None and credentials is None:
+        return _DEV_USER
     # Validación de token en producción o cuando se proporciona
     # if credentials is None:
     #     logger.warning(
@@ -69,20 +142,18 @@ async def get_current_user(
         )
     try:
         token = request.cookies.get("user_token")
-        masked_token = None
-        if token:
-            masked_token = token[:8] + "..." if len(token) > 8 else token
-        logger.debug(
-            "Authentication cookie retrieved",
-            extra={
-                "extra_data": {
-                    "path": request.url.path,
-                    "has_token": bool(token),
-                    "masked_token": masked_token,
-                    "client_ip": request.client.host if request.client else None,
+        # Se evalúa solo con DEBUG activo: corre en cada petición autenticada
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Authentication cookie retrieved",
+                extra={
+                    "extra_data": {
+                        "path": request.url.path,
+                        "has_token": bool(token),
+                        "client_ip": request.client.host if request.client else None,
+                    }
                 }
-            }
-        )
+            )
         if not token:
             logger.warning(
                 "Authentication failed: missing user_token cookie",
@@ -99,39 +170,7 @@ async def get_current_user(
                 detail="No se encontró cookie de autenticación 'user_token'",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        
-        user_id: str = payload.get("sub")  # 
-        email: str = payload.get("email")
-        rol_str: str = payload.get("rol", "user")
-        
-        if user_id is None or email is None:
-            raise AuthenticationError("Token inválido")
-        
-        # Convertir string de rol a enum Role
-        try:
-            rol = Role(rol_str.lower())
-        except ValueError:
-            rol = Role.USER  # Rol por defecto si no es válido
-        
-        # Obtener permisos según el rol
-        permissions = ROLE_PERMISSIONS.get(rol, set())
-        
-        return CurrentUser(
-            id=user_id,
-            user_id=payload.get("user_id"),  # ID del datawarehouse
-            email=email,
-            first_name=payload.get("first_name", ""),
-            last_name=payload.get("last_name", ""),
-            puntos_disponibles=payload.get("puntos_disponibles", 0),
-            rol=rol,
-            permissions=permissions,
-            is_active=payload.get("is_active", True)
-        )
+        return _user_from_token(token)
         
     except JWTError as exc:
         logger.error(
@@ -181,19 +220,32 @@ async def require_active_user(
 
 
 # === Autorización basada en permisos (no por rol) ===
+# permiso -> dependencia; la misma función para un permiso permite que FastAPI la resuelva una vez por petición
+_DEP_CACHE: Dict[str, Callable[..., CurrentUser]] = {}
+
+
 def require_permission(permission: str) -> Callable[..., CurrentUser]:
-    """Crea una dependencia que exige un permiso específico.
+    """Retorna la dependencia que exige un permiso específico.
     
     - Verifica que el permiso esté presente en `current_user.permissions`.
     - Lanza 403 si no lo tiene.
+    - Se crea una sola vez por permiso y se reutiliza en llamadas posteriores.
     """
+    dependency = _DEP_CACHE.get(permission)
+    if dependency is None:
+        dependency = _DEP_CACHE[permission] = _make_permission_dependency(permission)
+    return dependency
+
+
+def _make_permission_dependency(permission: str) -> Callable[..., CurrentUser]:
+    """Construye la dependencia de `require_permission`"""
+    detail = f"Permiso requerido: {permission}"
+
     async def _dependency(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
         if permission not in current_user.permissions:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Permiso requerido: {permission}"
-            )
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
         return current_user
+    _dependency.__name__ = f"require_{permission}"
     return _dependency
 
 
@@ -210,3 +262,7 @@ require_give_extra_points = require_permission("give_extra_points")
 require_create_users = require_permission("create_users")
 require_create_managers = require_permission("create_managers")
 require_system_config = require_permission("system_config")
+
+
+# Alias reutilizable para declarar el usuario autenticado en los endpoints
+CurrentUserDep = Annotated[CurrentUser, Depends(get_current_user)]
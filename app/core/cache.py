@@ -0,0 +1,79 @@
+"""Caché de respuestas con Redis - Conexión compartida y utilidades de lectura/invalidación"""
+
+from typing import Annotated, Any, Awaitable, Callable, Iterable, Optional
+
+import orjson
+from fastapi import Depends
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Pool de conexiones compartido por todo el proceso (None si la caché está deshabilitada)
+_pool: Optional[ConnectionPool] = (
+    ConnectionPool.from_url(settings.REDIS_URL) if settings.REDIS_URL else None
+)
+_client: Optional[Redis] = Redis(connection_pool=_pool) if _pool is not None else None
+
+
+def get_redis() -> Optional[Redis]:
+    """Dependency para FastAPI - obtiene el cliente Redis (None si no hay REDIS_URL)"""
+    return _client
+
+
+# Alias para inyectar el cliente Redis en los endpoints
+RedisDep = Annotated[Optional[Redis], Depends(get_redis)]
+
+
+async def cached(
+    cache: Optional[Redis],
+    key: str,
+    ttl: int,
+    loader: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    Retorna el valor cacheado en `key` o lo obtiene con `loader` y lo guarda por `ttl` segundos
+
+    Si Redis no está configurado o no responde, se llama directamente a `loader`.
+    """
+    if cache is None:
+        return await loader()
+
+    try:
+        hit = await cache.get(key)
+    except RedisError as exc:
+        logger.warning("Cache read failed", extra={"extra_data": {"key": key, "error": str(exc)}})
+        return await loader()
+
+    if hit is not None:
+        return orjson.loads(hit)
+
+    result = await loader()
+    try:
+        await cache.set(key, orjson.dumps(result), ex=ttl)
+    except RedisError as exc:
+        logger.warning("Cache write failed", extra={"extra_data": {"key": key, "error": str(exc)}})
+    return result
+
+
+async def invalidate(
+    cache: Optional[Redis],
+    keys: Iterable[str] = (),
+    patterns: Iterable[str] = ()
+) -> None:
+    """Elimina claves exactas y claves que coincidan con los patrones (usando SCAN, no KEYS)"""
+    if cache is None:
+        return
+
+    try:
+        to_delete = list(keys)
+        for pattern in patterns:
+            to_delete.extend([k async for k in cache.scan_iter(match=pattern, count=500)])
+        if to_delete:
+            await cache.unlink(*to_delete)
+    except RedisError as exc:
+        logger.warning("Cache invalidation failed", extra={"extra_data": {"error": str(exc)}})
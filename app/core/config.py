@@ -1,5 +1,8 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Union, Annotated
+import json
+from functools import cached_property
+
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+from typing import List, Optional, Annotated
 from pydantic import field_validator, Field
 
 
@@ -24,6 +27,11 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = Field(..., description="Contraseña de la base de datos")
     DB_DRIVER: str = Field("asyncpg", description="Driver de conexión (asyncpg o psycopg2)")
     DB_ESQUEMA: str = Field('public', description="Esquema de la base de datos")
+    DB_POOL_SIZE: int = Field(10, description="Conexiones persistentes del pool por worker")
+    DB_MAX_OVERFLOW: int = Field(10, description="Conexiones extra permitidas sobre el pool en picos")
+    DB_POOL_RECYCLE: int = Field(1800, description="Segundos tras los cuales se recicla una conexión")
+    DB_POOL_TIMEOUT: int = Field(5, description="Segundos máximos de espera por una conexión libre del pool")
+    DB_STATEMENT_CACHE_SIZE: int = Field(500, description="Sentencias preparadas cacheadas por conexión (asyncpg)")
     
     #Datawarehouse
     DB_HOST_DW: str = Field(..., description="Host de la base de datos")
@@ -33,14 +41,14 @@ class Settings(BaseSettings):
     DB_PASSWORD_DW: str = Field(..., description="Contraseña de la base de datos")
     DB_DRIVER_DW: str = Field("asyncpg", description="Driver de conexión (asyncpg o psycopg2)")
 
-    @property
+    @cached_property
     def DATABASE_URL(self) -> str:
-        """Construye automáticamente la URL de conexión"""
+        """Construye automáticamente la URL de conexión (una vez; la configuración no cambia en caliente)"""
         return f"postgresql+{self.DB_DRIVER}://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
-    @property
+    @cached_property
     def DATABASE_URL_DW(self) -> str:
-        """Construye automáticamente la URL de conexión"""
+        """Construye automáticamente la URL de conexión (una vez; la configuración no cambia en caliente)"""
         return f"postgresql+{self.DB_DRIVER_DW}://{self.DB_USER_DW}:{self.DB_PASSWORD_DW}@{self.DB_HOST_DW}:{self.DB_PORT_DW}/{self.DB_NAME_DW}"
 
     
@@ -64,11 +72,20 @@ class Settings(BaseSettings):
     # --------------------------------------------------
     LOG_LEVEL: str = "INFO"
     
-    CORS_ALLOWED_ORIGINS: Union[str, List[str]] = ""
+    # --------------------------------------------------
+    # Caché (Redis)
+    # --------------------------------------------------
+    REDIS_URL: Optional[str] = Field(None, description="URL de Redis; si no se define, la caché queda deshabilitada")
+    
+    # NoDecode: la variable llega como texto y se interpreta una sola vez en split_cors
+    CORS_ALLOWED_ORIGINS: Annotated[List[str], NoDecode] = []
 
     @field_validator("CORS_ALLOWED_ORIGINS", mode="before")
     def split_cors(cls, v):
         if isinstance(v, str):
+            # Se mantiene el formato JSON (["http://a", ...]) además del separado por comas
+            if v.lstrip().startswith("["):
+                return json.loads(v)
             return [x.strip() for x in v.split(",") if x.strip()]
         return v
 
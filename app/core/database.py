@@ -1,8 +1,10 @@
 """Configuración de base de datos - Conexión y sesión con SQLAlchemy async"""
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -20,7 +22,18 @@ engine = create_async_engine(
     echo=settings.LOG_LEVEL == "DEBUG",
     future=True,
     pool_pre_ping=True,
-    pool_recycle=300,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    # Con el pool saturado se falla rápido en lugar de encolar peticiones 30s (default)
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    # LIFO reutiliza las conexiones calientes y deja expirar las ociosas
+    pool_use_lifo=True,
+    # Cada conexión reutiliza el parse/plan de las consultas repetidas (el default de asyncpg es 100)
+    connect_args=(
+        {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+        if settings.DB_DRIVER == "asyncpg" else {}
+    ),
 )
 
 # Crear session factory
@@ -60,6 +73,15 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def warmup_pool() -> None:
+    """Abre las conexiones base del pool al iniciar para no pagar el handshake en las primeras peticiones"""
+    async def _ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_ping() for _ in range(settings.DB_POOL_SIZE)))
+
+
 async def create_tables():
     """Crea todas las tablas en la base de datos"""
     async with engine.begin() as conn:
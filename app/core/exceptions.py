@@ -6,6 +6,9 @@ from typing import Any, Dict, Optional
 class BaseAppException(Exception):
     """Excepción base para todas las excepciones de la aplicación"""
     
+    # Código HTTP con el que se responde cuando la excepción llega al handler global
+    status_code: int = 400
+    
     def __init__(
         self,
         message: str,
@@ -33,6 +36,8 @@ class BusinessRuleException(BaseAppException):
 class InfrastructureError(BaseAppException):
     """Excepción para errores de infraestructura"""
     
+    status_code = 500
+    
     def __init__(
         self,
         message: str,
@@ -45,6 +50,8 @@ class InfrastructureError(BaseAppException):
 class AuthenticationError(BaseAppException):
     """Excepción para errores de autenticación"""
     
+    status_code = 401
+    
     def __init__(
         self,
         message: str = "No autenticado",
@@ -57,6 +64,8 @@ class AuthenticationError(BaseAppException):
 class AuthorizationError(BaseAppException):
     """Excepción para errores de autorización"""
     
+    status_code = 403
+    
     def __init__(
         self,
         message: str = "No autorizado",
@@ -81,6 +90,8 @@ class ValidationError(BaseAppException):
 class NotFoundError(BaseAppException):
     """Excepción para recursos no encontrados"""
     
+    status_code = 404
+    
     def __init__(
         self,
         message: str = "Recurso no encontrado",
@@ -93,6 +104,8 @@ class NotFoundError(BaseAppException):
 class ConflictError(BaseAppException):
     """Excepción para conflictos (duplicados, violaciones de unicidad)"""
     
+    status_code = 409
+    
     def __init__(
         self,
         message: str = "Conflicto con recurso existente",
@@ -100,3 +113,15 @@ class ConflictError(BaseAppException):
         details: Optional[Dict[str, Any]] = None
     ):
         super().__init__(message, error_code, details)
+
+
+class DatawarehouseException(BaseAppException):
+    """Excepción para errores de consulta al datawarehouse"""
+    
+    def __init__(
+        self,
+        message: str,
+        error_code: str = "APP-ERR-008",
+        details: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(message, error_code, details)
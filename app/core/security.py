@@ -2,10 +2,10 @@
 
 from enum import Enum
 from functools import wraps
-from typing import List, Optional, Set
+from typing import FrozenSet, List, Optional, Set
 
 from fastapi import HTTPException, status
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from app.core.exceptions import AuthorizationError
 
@@ -45,6 +45,9 @@ class Permission(str, Enum):
 
 class CurrentUser(BaseModel):
     """Modelo para el usuario actual autenticado"""
+    # Inmutable: la misma instancia se reutiliza entre peticiones desde la caché de tokens
+    model_config = ConfigDict(frozen=True)
+    
     id: str  # UUID del usuario
     user_id: Optional[int] = None  # ID del datawarehouse
     email: str
@@ -52,7 +55,7 @@ class CurrentUser(BaseModel):
     last_name: str
     puntos_disponibles: int = 0
     rol: Role  # Un solo rol
-    permissions: Set[Permission]
+    permissions: FrozenSet[Permission]
     is_active: bool = True
     
     @property
@@ -87,15 +90,15 @@ class CurrentUser(BaseModel):
         return False
 
 
-# Mapeo de roles a permisos
+# Mapeo de roles a permisos (frozenset: se comparten entre todos los usuarios del rol)
 ROLE_PERMISSIONS = {
-    Role.USER: {
+    Role.USER: frozenset({
         Permission.REDEEM_POINTS,
         Permission.VIEW_OWN_POINTS,
         Permission.VIEW_OWN_HISTORY,
         Permission.VIEW_BENEFITS
-    },
-    Role.USER_LEADER: {
+    }),
+    Role.USER_LEADER: frozenset({
         # Permisos de USER +
         Permission.REDEEM_POINTS,
         Permission.VIEW_OWN_POINTS,
@@ -104,8 +107,8 @@ ROLE_PERMISSIONS = {
         # Permisos adicionales de LEADER
         Permission.VIEW_TEAM_POINTS,
         Permission.VIEW_TEAM_HISTORY
-    },
-    Role.MANAGER: {
+    }),
+    Role.MANAGER: frozenset({
         # Permisos de USER_LEADER +
         Permission.REDEEM_POINTS,
         Permission.VIEW_OWN_POINTS,
@@ -118,8 +121,8 @@ ROLE_PERMISSIONS = {
         Permission.MANAGE_BENEFITS,
         Permission.GIVE_EXTRA_POINTS,
         Permission.CREATE_USERS
-    },
-    Role.ADMIN: {
+    }),
+    Role.ADMIN: frozenset({
         # Todos los permisos anteriores +
         Permission.REDEEM_POINTS,
         Permission.VIEW_OWN_POINTS,
@@ -134,7 +137,7 @@ ROLE_PERMISSIONS = {
         # Permisos exclusivos de ADMIN
         Permission.CREATE_MANAGERS,
         Permission.SYSTEM_CONFIG
-    }
+    })
 }
 
 
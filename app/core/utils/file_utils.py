@@ -3,9 +3,25 @@
 import os
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional
 
 from fastapi import UploadFile, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Tamaño máximo permitido para imágenes subidas (5MB)
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+
+# Tamaño de bloque usado al copiar el archivo subido a disco
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class FileTooLargeError(Exception):
+    """El archivo subido supera MAX_UPLOAD_BYTES"""
 
 
 class FileManager:
@@ -41,7 +57,7 @@ class FileManager:
             )
         
         # Validar tamaño (máximo 5MB)
-        max_size = 5 * 1024 * 1024  # 5MB en bytes
+        max_size = MAX_UPLOAD_BYTES
         if hasattr(file, 'size') and file.size and file.size > max_size:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -96,32 +112,67 @@ class FileManager:
             # Ruta completa donde guardar el archivo
             file_path = self.beneficios_path / unique_filename
             
-            # Leer y guardar el archivo
-            content = await file.read()
-            
-            with open(file_path, "wb") as f:
-                f.write(content)
+            # Copiar el archivo por bloques en un thread, sin cargarlo completo en memoria
+            try:
+                await run_in_threadpool(self._copy_to_disk, file.file, file_path)
+            except FileTooLargeError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={
+                        "message": f"Archivo demasiado grande. Tamaño máximo permitido: {MAX_UPLOAD_BYTES // (1024*1024)}MB",
+                        "error_code": "FILE-ERR-002",
+                        "details": {"max_size": MAX_UPLOAD_BYTES}
+                    }
+                ) from None
+            except OSError as e:
+                # El detalle del error (rutas del servidor) solo va al log
+                logger.error(
+                    "Error al guardar archivo",
+                    extra={"extra_data": {"file_path": str(file_path), "error": str(e)}}
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail={
+                        "message": "Error interno al guardar archivo",
+                        "error_code": "FILE-ERR-005"
+                    }
+                ) from e
             
             # Retornar URL relativa
             return f"/static/media/beneficios/{unique_filename}"
             
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail={
-                    "message": "Error interno al guardar archivo",
-                    "error_code": "FILE-ERR-005",
-                    "details": {"internal_error": str(e)}
-                }
-            )
         finally:
             # Resetear el puntero del archivo para uso posterior si es necesario
             if hasattr(file, 'seek'):
                 await file.seek(0)
     
-    def delete_beneficio_image(self, image_url: str) -> bool:
+    @staticmethod
+    def _copy_to_disk(source: BinaryIO, file_path: Path) -> int:
+        """Copia `source` a `file_path` por bloques, validando el tamaño máximo"""
+        written = 0
+        try:
+            with open(file_path, "wb") as f:
+                while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > MAX_UPLOAD_BYTES:
+                        raise FileTooLargeError()
+                    f.write(chunk)
+        except FileTooLargeError:
+            # Eliminar el archivo parcial sin volver al event loop
+            file_path.unlink(missing_ok=True)
+            raise
+        return written
+    
+    @staticmethod
+    def _unlink_if_exists(file_path: Path) -> bool:
+        """Elimina `file_path` si existe; retorna True si se eliminó"""
+        try:
+            file_path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+    
+    async def delete_beneficio_image(self, image_url: str) -> bool:
         """
         Elimina una imagen de beneficio del sistema de archivos
         
@@ -139,13 +190,10 @@ class FileManager:
             filename = image_url.split("/")[-1]
             file_path = self.beneficios_path / filename
             
-            if file_path.exists():
-                file_path.unlink()
-                return True
-            
-            return False
+            # exists() + unlink() en un solo salto al threadpool
+            return await run_in_threadpool(self._unlink_if_exists, file_path)
             
-        except Exception:
+        except OSError:
             return False
     
     def get_image_info(self, image_url: str) -> Optional[dict]:
@@ -178,7 +226,7 @@ class FileManager:
                 "exists": True
             }
             
-        except Exception:
+        except OSError:
             return None
 
 
@@ -0,0 +1,89 @@
+"""Utilidades de caché HTTP - ETag / If-None-Match y Last-Modified / If-Modified-Since"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+import orjson
+from fastapi import Request, Response, status
+
+
+def compute_etag(body: bytes) -> str:
+    """Calcula un ETag débil a partir del cuerpo serializado"""
+    return f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Indica si el cliente ya tiene la versión `etag` (cabecera If-None-Match)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Comparación débil: se ignora el prefijo W/
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def json_with_etag(
+    request: Request,
+    content: Any,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Serializa `content` con orjson y responde 304 si coincide con If-None-Match
+
+    El ETag se envía siempre para que el cliente pueda revalidar en la siguiente petición.
+    """
+    body = orjson.dumps(content)
+    etag = compute_etag(body)
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Normaliza a UTC con precisión de segundos (la de las fechas HTTP); las fechas naive se asumen UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def not_modified_since(request: Request, last_modified: datetime) -> bool:
+    """Indica si el recurso no cambió desde la fecha de If-Modified-Since"""
+    # If-None-Match tiene prioridad sobre If-Modified-Since (RFC 9110)
+    if request.headers.get("if-none-match"):
+        return False
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return _as_utc(last_modified) <= _as_utc(since)
+
+
+def json_with_last_modified(
+    request: Request,
+    last_modified: datetime,
+    build: Callable[[], Any]
+) -> Response:
+    """
+    Responde 304 si el cliente ya tiene la versión de `last_modified`; si no, serializa `build()` con orjson
+
+    `build` solo se invoca cuando hay que enviar el cuerpo, así se evita validar el modelo en los 304.
+    """
+    headers = {
+        "Last-Modified": format_datetime(_as_utc(last_modified), usegmt=True),
+        "Cache-Control": "no-cache"
+    }
+
+    if not_modified_since(request, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=orjson.dumps(build()), media_type="application/json", headers=headers)
@@ -3,6 +3,10 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import List, Union
 
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 def send_email(
     recipients: Union[str, List[str]],
@@ -44,7 +48,10 @@ def send_email(
             server.starttls()
             server.login(smtp_user, smtp_password)
             server.send_message(msg)
-            print(f"✅ Correo enviado a: {', '.join(recipients)}")
+            logger.info("Correo enviado", extra={"extra_data": {"recipients": recipients, "subject": subject}})
 
     except smtplib.SMTPException as e:
-        print(f"❌ Error al enviar el correo: {e}")
+        logger.error(
+            "Error al enviar el correo",
+            extra={"extra_data": {"recipients": recipients, "subject": subject, "error": str(e)}}
+        )
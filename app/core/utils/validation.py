@@ -7,10 +7,14 @@ from uuid import UUID
 from app.core.exceptions import ValidationError
 
 
+# Formato sintáctico de email, compartido con los esquemas Pydantic; anclado y sin alternancias
+EMAIL_PATTERN = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+_EMAIL_RE = re.compile(EMAIL_PATTERN)
+
+
 def validate_email(email: str) -> bool:
     """Valida formato de email"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return _EMAIL_RE.fullmatch(email) is not None
 
 
 def validate_uuid(uuid_str: str) -> bool:
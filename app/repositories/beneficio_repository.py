@@ -1,16 +1,40 @@
 """Repositorio de beneficios - Acceso a datos con SQL RAW"""
 
-from datetime import datetime
 from typing import List, Optional
 from uuid import UUID, uuid4
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.utils.date_utils import utc_now
+
+
+# Consultas de búsqueda construidas una sola vez; los ILIKE '%termino%' usan los índices
+# trigram de la migración 004
+_SEARCH_QUERY = text("""
+    SELECT id, imagen, beneficio, detalle, valor, requiere_jornada, is_active, created_at, updated_at
+    FROM puntos_flesan.beneficios
+    WHERE 
+        beneficio ILIKE :search_term
+        OR detalle ILIKE :search_term
+    ORDER BY created_at DESC
+    OFFSET :skip LIMIT :limit
+""")
+
+_COUNT_SEARCH_QUERY = text("""
+    SELECT COUNT(id) as total
+    FROM puntos_flesan.beneficios
+    WHERE 
+        beneficio ILIKE :search_term
+        OR detalle ILIKE :search_term
+""")
+
 
 class BeneficioRepository:
     """Repositorio para operaciones de base de datos de beneficios usando SQL RAW"""
     
+    __slots__ = ("session",)
+    
     def __init__(self, session: AsyncSession):
         self.session = session
     
@@ -24,7 +48,7 @@ class BeneficioRepository:
     ) -> dict:
         """Crea un nuevo beneficio usando SQL RAW"""
         beneficio_id = uuid4()
-        created_at = datetime.utcnow()
+        created_at = utc_now()
         
         query = text("""
             INSERT INTO puntos_flesan.beneficios 
@@ -87,31 +111,32 @@ class BeneficioRepository:
         valor: Optional[int] = None,
         requiresJourney: Optional[bool] = None,
         is_active: Optional[bool] = None
-    ) -> dict:
-        """Actualiza un beneficio usando SQL RAW"""
-        # Obtener beneficio actual
-        current = await self.get_by_id(beneficio_id)
-        if not current:
-            raise ValueError(f"Beneficio con ID {beneficio_id} no encontrado")
+    ) -> Optional[dict]:
+        """
+        Actualiza un beneficio en una sola sentencia usando SQL RAW
         
-        # Preparar valores actualizados
-        updated_imagen = imagen if imagen is not None else current["imagen"]
-        updated_beneficio = beneficio if beneficio is not None else current["beneficio"]
-        updated_detalle = detalle if detalle is not None else current["detalle"]
-        updated_valor = valor if valor is not None else current["valor"]
-        updated_requires = requiresJourney if requiresJourney is not None else current["requiresJourney"]
-        updated_is_active = is_active if is_active is not None else current["is_active"]
+        Los campos en None conservan su valor actual (COALESCE). Si se cambia el nombre, la fila
+        solo se actualiza cuando ningún otro beneficio lo usa. Retorna None si no se actualizó nada
+        (beneficio inexistente o nombre tomado).
+        """
+        name_guard = ""
+        if beneficio is not None:
+            name_guard = """
+              AND NOT EXISTS (
+                  SELECT 1 FROM puntos_flesan.beneficios otro
+                  WHERE LOWER(otro.beneficio) = LOWER(:beneficio) AND otro.id <> :beneficio_id
+              )"""
         
-        query = text("""
+        query = text(f"""
             UPDATE puntos_flesan.beneficios
-            SET imagen = :imagen,
-                beneficio = :beneficio,
-                detalle = :detalle,
-                valor = :valor,
-                requiere_jornada = :requiere_jornada,
-                is_active = :is_active,
+            SET imagen = COALESCE(:imagen, imagen),
+                beneficio = COALESCE(:beneficio, beneficio),
+                detalle = COALESCE(:detalle, detalle),
+                valor = COALESCE(:valor, valor),
+                requiere_jornada = COALESCE(:requiere_jornada, requiere_jornada),
+                is_active = COALESCE(:is_active, is_active),
                 updated_at = :updated_at
-            WHERE id = :beneficio_id
+            WHERE id = :beneficio_id{name_guard}
             RETURNING id, imagen, beneficio, detalle, valor, requiere_jornada, is_active, created_at, updated_at
         """)
         
@@ -119,18 +144,18 @@ class BeneficioRepository:
             query,
             {
                 "beneficio_id": str(beneficio_id),
-                "imagen": updated_imagen,
-                "beneficio": updated_beneficio,
-                "detalle": updated_detalle,
-                "valor": updated_valor,
-                "requiere_jornada": updated_requires,
-                "is_active": updated_is_active,
-                "updated_at": datetime.utcnow()
+                "imagen": imagen,
+                "beneficio": beneficio,
+                "detalle": detalle,
+                "valor": valor,
+                "requiere_jornada": requiresJourney,
+                "is_active": is_active,
+                "updated_at": utc_now()
             }
         )
         
         row = result.fetchone()
-        return self._row_to_dict(row)
+        return self._row_to_dict(row) if row else None
     
     async def delete(self, beneficio_id: UUID) -> bool:
         """Elimina un beneficio (soft delete) usando SQL RAW"""
@@ -146,7 +171,7 @@ class BeneficioRepository:
             query,
             {
                 "beneficio_id": str(beneficio_id),
-                "updated_at": datetime.utcnow()
+                "updated_at": utc_now()
             }
         )
         
@@ -210,19 +235,9 @@ class BeneficioRepository:
         limit: int = 10
     ) -> List[dict]:
         """Busca beneficios por texto usando SQL RAW"""
-        query = text("""
-            SELECT id, imagen, beneficio, detalle, valor, requiere_jornada, is_active, created_at, updated_at
-            FROM puntos_flesan.beneficios
-            WHERE 
-                LOWER(beneficio) LIKE LOWER(:search_term)
-                OR LOWER(detalle) LIKE LOWER(:search_term)
-            ORDER BY created_at DESC
-            OFFSET :skip LIMIT :limit
-        """)
-        
         search_pattern = f"%{search_term}%"
         result = await self.session.execute(
-            query,
+            _SEARCH_QUERY,
             {"search_term": search_pattern, "skip": skip, "limit": limit}
         )
         rows = result.fetchall()
@@ -231,16 +246,8 @@ class BeneficioRepository:
     
     async def count_search(self, search_term: str) -> int:
         """Cuenta resultados de búsqueda usando SQL RAW"""
-        query = text("""
-            SELECT COUNT(id) as total
-            FROM puntos_flesan.beneficios
-            WHERE 
-                LOWER(beneficio) LIKE LOWER(:search_term)
-                OR LOWER(detalle) LIKE LOWER(:search_term)
-        """)
-        
         search_pattern = f"%{search_term}%"
-        result = await self.session.execute(query, {"search_term": search_pattern})
+        result = await self.session.execute(_COUNT_SEARCH_QUERY, {"search_term": search_pattern})
         row = result.fetchone()
         return row.total if row else 0
     
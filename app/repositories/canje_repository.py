@@ -1,16 +1,20 @@
 """Repositorio de canjes - Acceso a datos con SQL RAW"""
 
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from uuid import UUID, uuid4
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.utils.date_utils import utc_now
+
 
 class CanjeRepository:
     """Repositorio para operaciones de base de datos de canjes usando SQL RAW"""
     
+    __slots__ = ("session",)
+    
     def __init__(self, session: AsyncSession):
         self.session = session
     
@@ -26,8 +30,7 @@ class CanjeRepository:
     ) -> dict:
         """Crea un nuevo registro de canje usando SQL RAW"""
         canje_id = uuid4()
-        created_at = datetime.utcnow()
-        print(user_id)
+        created_at = utc_now()
         query = text("""
             INSERT INTO puntos_flesan.historial_canjes 
             (id, user_id, beneficio_id, puntos_canjeados, fecha_canje, fecha_uso, jornada,
@@ -79,8 +82,8 @@ class CanjeRepository:
         skip: int = 0,
         limit: int = 10,
         estado: Optional[str] = None
-    ) -> List[dict]:
-        """Obtiene los canjes de un usuario con paginación usando SQL RAW"""
+    ) -> Tuple[List[dict], int]:
+        """Obtiene una página de canjes de un usuario y el total usando SQL RAW"""
         where_conditions = ["user_id = :user_id"]
         params = {"user_id": user_id, "skip": skip, "limit": limit}
         
@@ -90,19 +93,10 @@ class CanjeRepository:
         
         where_clause = "WHERE " + " AND ".join(where_conditions)
         
-        query = text(f"""
-            SELECT id, user_id, beneficio_id, puntos_canjeados, fecha_canje, fecha_uso, jornada,
-                   estado, observaciones, created_at, updated_at
-            FROM puntos_flesan.historial_canjes
-            {where_clause}
-            ORDER BY fecha_canje DESC
-            OFFSET :skip LIMIT :limit
-        """)
-        
-        result = await self.session.execute(query, params)
-        rows = result.fetchall()
-        
-        return [self._row_to_dict(row) for row in rows]
+        canjes, total = await self._fetch_page(where_clause, params)
+        if total is None:
+            total = await self.count_by_user_id(user_id=user_id, estado=estado)
+        return canjes, total
     
     async def count_by_user_id(self, user_id: int, estado: Optional[str] = None) -> int:
         """Cuenta los canjes de un usuario usando SQL RAW"""
@@ -132,38 +126,37 @@ class CanjeRepository:
         user_id: Optional[int] = None,
         beneficio_id: Optional[UUID] = None,
         estado: Optional[str] = None
-    ) -> List[dict]:
-        """Lista canjes con filtros usando SQL RAW"""
-        where_conditions = []
-        params = {"skip": skip, "limit": limit}
-        
-        if user_id:
-            where_conditions.append("user_id = :user_id")
-            params["user_id"] = user_id
-        
-        if beneficio_id:
-            where_conditions.append("beneficio_id = :beneficio_id")
-            params["beneficio_id"] = str(beneficio_id)
+    ) -> Tuple[List[dict], int]:
+        """Lista una página de canjes con filtros y el total usando SQL RAW"""
+        where_clause, params = self._list_filters(user_id, beneficio_id, estado)
+        params.update(skip=skip, limit=limit)
         
-        if estado:
-            where_conditions.append("estado = :estado")
-            params["estado"] = estado
-        
-        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
-        
-        query = text(f"""
-            SELECT id, user_id, beneficio_id, puntos_canjeados, fecha_canje, fecha_uso,
-                   estado, observaciones, created_at, updated_at
-            FROM puntos_flesan.historial_canjes
-            {where_clause}
-            ORDER BY fecha_canje DESC
-            OFFSET :skip LIMIT :limit
-        """)
-        
-        result = await self.session.execute(query, params)
-        rows = result.fetchall()
+        canjes, total = await self._fetch_page(where_clause, params)
+        if total is None:
+            total = await self.count_canjes(
+                user_id=user_id,
+                beneficio_id=beneficio_id,
+                estado=estado
+            )
+        return canjes, total
+    
+    async def stream_canjes(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        user_id: Optional[int] = None,
+        beneficio_id: Optional[UUID] = None,
+        estado: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """Recorre una página de canjes fila a fila sin materializarla completa"""
+        where_clause, params = self._list_filters(user_id, beneficio_id, estado)
+        params.update(skip=skip, limit=limit)
         
-        return [self._row_to_dict(row) for row in rows]
+        result = await self.session.stream(self._page_query(where_clause, with_total=False), params)
+        async for row in result:
+            canje = self._row_to_dict(row)
+            canje["puntos_restantes"] = row.puntos_restantes
+            yield canje
     
     async def count_canjes(
         self,
@@ -172,22 +165,7 @@ class CanjeRepository:
         estado: Optional[str] = None
     ) -> int:
         """Cuenta canjes con filtros usando SQL RAW"""
-        where_conditions = []
-        params = {}
-        
-        if user_id:
-            where_conditions.append("user_id = :user_id")
-            params["user_id"] = user_id
-        
-        if beneficio_id:
-            where_conditions.append("beneficio_id = :beneficio_id")
-            params["beneficio_id"] = beneficio_id
-        
-        if estado:
-            where_conditions.append("estado = :estado")
-            params["estado"] = estado
-        
-        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        where_clause, params = self._list_filters(user_id, beneficio_id, estado)
         
         query = text(f"""
             SELECT COUNT(id) as total
@@ -222,13 +200,80 @@ class CanjeRepository:
                 "canje_id": str(canje_id),
                 "estado": estado,
                 "observaciones": observaciones,
-                "updated_at": datetime.utcnow()
+                "updated_at": utc_now()
             }
         )
         
         row = result.fetchone()
         return self._row_to_dict(row) if row else None
     
+    async def _fetch_page(self, where_clause: str, params: dict) -> Tuple[List[dict], Optional[int]]:
+        """
+        Obtiene una página de canjes con el total y los puntos actuales del usuario en una sola consulta
+        
+        El total viaja en cada fila (COUNT(*) OVER()); si la página viene vacía y no es la
+        primera, retorna None para que el llamador lo cuente aparte.
+        """
+        result = await self.session.execute(self._page_query(where_clause, with_total=True), params)
+        rows = result.fetchall()
+        
+        if not rows:
+            return [], (0 if params["skip"] == 0 else None)
+        
+        canjes = []
+        for row in rows:
+            canje = self._row_to_dict(row)
+            canje["puntos_restantes"] = row.puntos_restantes
+            canjes.append(canje)
+        return canjes, rows[0].total_count
+    
+    @staticmethod
+    def _list_filters(
+        user_id: Optional[int],
+        beneficio_id: Optional[UUID],
+        estado: Optional[str]
+    ) -> Tuple[str, dict]:
+        """Construye el WHERE y los parámetros de los filtros del listado de canjes"""
+        where_conditions = []
+        params = {}
+        
+        if user_id:
+            where_conditions.append("user_id = :user_id")
+            params["user_id"] = user_id
+        
+        if beneficio_id:
+            where_conditions.append("beneficio_id = :beneficio_id")
+            params["beneficio_id"] = str(beneficio_id)
+        
+        if estado:
+            where_conditions.append("estado = :estado")
+            params["estado"] = estado
+        
+        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        return where_clause, params
+    
+    @staticmethod
+    def _page_query(where_clause: str, with_total: bool):
+        """Consulta de una página de canjes con los puntos actuales de cada usuario"""
+        total_column = ",\n                       COUNT(*) OVER() AS total_count" if with_total else ""
+        return text(f"""
+            SELECT p.*,
+                   COALESCE(
+                       (SELECT u.puntos_disponibles FROM puntos_flesan.users u
+                        WHERE u.user_id = p.user_id LIMIT 1),
+                       0
+                   ) AS puntos_restantes
+            FROM (
+                SELECT id, user_id, beneficio_id, puntos_canjeados, fecha_canje, fecha_uso, jornada,
+                       estado, observaciones, created_at, updated_at{total_column}
+                FROM puntos_flesan.historial_canjes
+                {where_clause}
+                ORDER BY fecha_canje DESC
+                OFFSET :skip LIMIT :limit
+            ) p
+            ORDER BY p.fecha_canje DESC
+        """)
+    
     def _row_to_dict(self, row) -> dict:
         """Convierte una fila de SQL RAW a diccionario"""
         if not row:
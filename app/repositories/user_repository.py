@@ -1,19 +1,35 @@
 """Repositorio de usuarios - Acceso a datos con SQL RAW"""
 
 import json
-from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID, uuid4
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import Role
+from app.core.utils.date_utils import utc_now
+
+
+# Máximo de palabras de una búsqueda que se traducen a condiciones (acota el tamaño del WHERE)
+MAX_SEARCH_TOKENS = 5
+
+# Página sin filtros (el caso del listado por defecto), construida una sola vez
+_LIST_ALL_QUERY = text("""
+    SELECT id, user_id, email, first_name, last_name, puntos_disponibles, rol, permisos,
+           is_active, created_at, updated_at, last_login,
+           COUNT(*) OVER() AS total_count
+    FROM puntos_flesan.users
+    ORDER BY created_at DESC
+    OFFSET :skip LIMIT :limit
+""")
 
 
 class UserRepository:
     """Repositorio para operaciones de base de datos de usuarios usando SQL RAW"""
     
+    __slots__ = ("session",)
+    
     def __init__(self, session: AsyncSession):
         self.session = session
     
@@ -29,7 +45,7 @@ class UserRepository:
         """Crea un nuevo usuario usando SQL RAW"""
         id = uuid4()
         roles_json = json.dumps([role.value for role in roles])
-        created_at = datetime.utcnow()
+        created_at = utc_now()
         
         query = text("""
             INSERT INTO puntos_flesan.users 
@@ -63,6 +79,54 @@ class UserRepository:
         row = result.fetchone()
         return self._row_to_dict(row)
     
+    async def create_if_not_exists(
+        self,
+        email: str,
+        first_name: str,
+        last_name: str,
+        roles: List[Role],
+        puntos: int = 0,
+        user_id: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Crea un usuario salvo que el email ya exista, en una sola sentencia usando SQL RAW
+        
+        INSERT ... ON CONFLICT (email) DO NOTHING: la verificación y la inserción son atómicas
+        (sin carrera entre dos altas con el mismo email). Retorna None si el email ya existía.
+        """
+        query = text("""
+            INSERT INTO puntos_flesan.users 
+            (id, user_id, email, first_name, last_name, puntos_disponibles, rol, permisos, 
+             is_active, created_at, updated_at, last_login)
+            VALUES 
+            (:id, :user_id, :email, :first_name, :last_name, :puntos, :rol, :permisos,
+             :is_active, :created_at, :updated_at, :last_login)
+            ON CONFLICT (email) DO NOTHING
+            RETURNING id, user_id, email, first_name, last_name, puntos_disponibles, rol, permisos,
+                      is_active, created_at, updated_at, last_login
+        """)
+        
+        result = await self.session.execute(
+            query,
+            {
+                "id": str(uuid4()),
+                "user_id": user_id,
+                "email": email.lower(),
+                "first_name": first_name,
+                "last_name": last_name,
+                "puntos": puntos,
+                "rol": roles[0].value if roles else "USER",
+                "permisos": json.dumps([role.value for role in roles]),
+                "is_active": True,
+                "created_at": utc_now(),
+                "updated_at": None,
+                "last_login": None
+            }
+        )
+        
+        row = result.fetchone()
+        return self._row_to_dict(row) if row else None
+    
     async def get_by_id(self, user_id: int) -> Optional[dict]:
         """Obtiene un usuario por ID usando SQL RAW"""
         query = text("""
@@ -117,7 +181,6 @@ class UserRepository:
         """Actualiza un usuario usando SQL RAW"""
         # Obtener usuario actual
         user = await self.get_by_id(user_id)
-        print(user)
         if not user:
             raise ValueError(f"Usuario con ID {user_id} no encontrado")
         
@@ -157,7 +220,7 @@ class UserRepository:
                 "last_name": updated_last_name,
                 "puntos": updated_puntos,
                 "is_active": updated_is_active,
-                "updated_at": datetime.utcnow()
+                "updated_at": utc_now()
             }
         )
         
@@ -178,7 +241,7 @@ class UserRepository:
             query,
             {
                 "user_id": user_id,
-                "updated_at": datetime.utcnow()
+                "updated_at": utc_now()
             }
         )
         
@@ -190,54 +253,67 @@ class UserRepository:
         skip: int = 0,
         limit: int = 10,
         email: Optional[str] = None,
-        is_active: Optional[bool] = None
-    ) -> List[dict]:
-        """Lista usuarios con filtros usando SQL RAW"""
-        where_conditions = []
-        params = {"skip": skip, "limit": limit}
+        is_active: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        search: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[int]]:
+        """
+        Lista una página de usuarios con filtros y el total usando SQL RAW
         
-        if email:
-            where_conditions.append("email ILIKE :email")
-            params["email"] = f"%{email}%"
+        Con `after_id` pagina por keyset sobre user_id (WHERE user_id > :after_id ORDER BY user_id)
+        en lugar de OFFSET, de modo que el costo no crece con la profundidad de la página.
+        Los usuarios sin user_id no participan de este modo, y el total no se calcula (None):
+        contarlo recorrería todas las filas del filtro en cada página.
         
-        if is_active is not None:
-            where_conditions.append("is_active = :is_active")
-            params["is_active"] = is_active
+        `search` filtra por palabras: cada una debe aparecer en el email, el nombre o el apellido.
         
-        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
-        
-        query = text(f"""
-            SELECT id, user_id, email, first_name, last_name, puntos_disponibles, rol, permisos,
-                   is_active, created_at, updated_at, last_login
-            FROM puntos_flesan.users
-            {where_clause}
-            ORDER BY created_at DESC
-            OFFSET :skip LIMIT :limit
-        """)
+        En modo OFFSET el total viaja en cada fila (COUNT(*) OVER()), así página y total
+        salen de una sola consulta; solo se cuenta aparte si la página viene vacía.
+        """
+        if email is None and is_active is None and after_id is None and not search:
+            # Sin filtros ni cursor: consulta constante, sin armar el WHERE
+            query = _LIST_ALL_QUERY
+            params = {"skip": skip, "limit": limit}
+        else:
+            where_clause, params = self._list_filters(email, is_active, after_id, search)
+            params["limit"] = limit
+            
+            if after_id is None:
+                params["skip"] = skip
+                total_column = ",\n                   COUNT(*) OVER() AS total_count"
+                pagination = "ORDER BY created_at DESC\n            OFFSET :skip LIMIT :limit"
+            else:
+                total_column = ""
+                pagination = "ORDER BY user_id\n            LIMIT :limit"
+            
+            query = text(f"""
+                SELECT id, user_id, email, first_name, last_name, puntos_disponibles, rol, permisos,
+                       is_active, created_at, updated_at, last_login{total_column}
+                FROM puntos_flesan.users
+                {where_clause}
+                {pagination}
+            """)
         
         result = await self.session.execute(query, params)
         rows = result.fetchall()
+        users = [self._row_to_dict(row) for row in rows]
         
-        return [self._row_to_dict(row) for row in rows]
+        if after_id is not None:
+            return users, None
+        if rows:
+            return users, rows[0].total_count
+        if skip == 0:
+            return users, 0
+        return users, await self.count_users(email=email, is_active=is_active, search=search)
     
     async def count_users(
         self,
         email: Optional[str] = None,
-        is_active: Optional[bool] = None
+        is_active: Optional[bool] = None,
+        search: Optional[str] = None
     ) -> int:
         """Cuenta usuarios con filtros usando SQL RAW"""
-        where_conditions = []
-        params = {}
-        
-        if email:
-            where_conditions.append("email ILIKE :email")
-            params["email"] = f"%{email}%"
-        
-        if is_active is not None:
-            where_conditions.append("is_active = :is_active")
-            params["is_active"] = is_active
-        
-        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        where_clause, params = self._list_filters(email, is_active, search=search)
         
         query = text(f"""
             SELECT COUNT(id) as total
@@ -250,17 +326,54 @@ class UserRepository:
         return row.total if row else 0
     
     async def exists_by_email(self, email: str) -> bool:
-        """Verifica si existe un usuario con el email dado usando SQL RAW"""
+        """
+        Verifica si existe un usuario con el email dado usando SQL RAW
+        
+        EXISTS se detiene en la primera coincidencia del índice único de email (los emails se
+        guardan en minúsculas) y retorna un booleano, sin contar ni leer la fila.
+        """
         query = text("""
-            SELECT COUNT(id) as total
-            FROM puntos_flesan.users
-            WHERE email = :email
+            SELECT EXISTS(
+                SELECT 1 FROM puntos_flesan.users WHERE email = :email
+            ) AS found
         """)
         
         result = await self.session.execute(query, {"email": email.lower()})
-        row = result.fetchone()
-        count = row.total if row else 0
-        return count > 0
+        return bool(result.scalar())
+    
+    @staticmethod
+    def _list_filters(
+        email: Optional[str],
+        is_active: Optional[bool],
+        after_id: Optional[int] = None,
+        search: Optional[str] = None
+    ) -> Tuple[str, dict]:
+        """Construye el WHERE y los parámetros de los filtros del listado de usuarios"""
+        where_conditions = []
+        params = {}
+        
+        if email:
+            where_conditions.append("email ILIKE :email")
+            params["email"] = f"%{email}%"
+        
+        if search:
+            # Cada palabra debe coincidir en alguna columna (AND entre palabras, OR entre columnas)
+            for i, token in enumerate(search.split()[:MAX_SEARCH_TOKENS]):
+                where_conditions.append(
+                    f"(email ILIKE :q{i} OR first_name ILIKE :q{i} OR last_name ILIKE :q{i})"
+                )
+                params[f"q{i}"] = f"%{token}%"
+        
+        if is_active is not None:
+            where_conditions.append("is_active = :is_active")
+            params["is_active"] = is_active
+        
+        if after_id is not None:
+            where_conditions.append("user_id > :after_id")
+            params["after_id"] = after_id
+        
+        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        return where_clause, params
     
     def _row_to_dict(self, row) -> dict:
         """Convierte una fila de SQL RAW a diccionario"""
@@ -1,6 +1,5 @@
 """Servicio de negocio para beneficios - Lógica de aplicación"""
 
-from math import ceil
 from typing import List, Optional
 from uuid import UUID
 
@@ -12,6 +11,8 @@ from app.repositories.beneficio_repository import BeneficioRepository
 class BeneficioService:
     """Servicio de negocio para operaciones de beneficios"""
     
+    __slots__ = ("repository",)
+    
     def __init__(self, repository: BeneficioRepository):
         self.repository = repository
     
@@ -78,19 +79,10 @@ class BeneficioService:
         - Campos no vacíos si se proporcionan
         - Valor no negativo si se proporciona
         """
-        # Verificar que beneficio existe
-        current = await self.get_beneficio_by_id(beneficio_id)
-        
         # Validar campos si se proporcionan
         if beneficio is not None:
             validate_not_empty_string(beneficio, "beneficio")
             beneficio = beneficio.strip()
-            
-            # Verificar nombre único si cambió
-            if beneficio.lower() != current["beneficio"].lower():
-                exists = await self.repository.get_by_name(beneficio)
-                if exists:
-                    raise ConflictError(f"Ya existe un beneficio con el nombre '{beneficio}'")
         
         if detalle is not None:
             validate_not_empty_string(detalle, "detalle")
@@ -102,8 +94,8 @@ class BeneficioService:
         if valor is not None and valor < 0:
             raise ValidationError("El valor debe ser mayor o igual a cero")
         
-        # Actualizar beneficio
-        return await self.repository.update(
+        # Existencia y nombre único se verifican dentro del mismo UPDATE
+        updated = await self.repository.update(
             beneficio_id=beneficio_id,
             imagen=imagen,
             beneficio=beneficio,
@@ -111,28 +103,34 @@ class BeneficioService:
             valor=valor,
             requiresJourney=requiresJourney
         )
+        if updated is not None:
+            return updated
+        
+        # Solo en el camino de error se consulta por qué no se actualizó
+        await self.get_beneficio_by_id(beneficio_id)
+        raise ConflictError(f"Ya existe un beneficio con el nombre '{beneficio}'")
     
     async def deactivate_beneficio(self, beneficio_id: UUID) -> dict:
         """Desactiva un beneficio (soft delete)"""
-        # Verificar que beneficio existe
-        await self.get_beneficio_by_id(beneficio_id)
-        
-        # Desactivar
-        return await self.repository.update(
+        updated = await self.repository.update(
             beneficio_id=beneficio_id,
             is_active=False
         )
+        if updated is None:
+            # Sin cambio de nombre, la única causa posible es que no exista
+            await self.get_beneficio_by_id(beneficio_id)
+        return updated
     
     async def activate_beneficio(self, beneficio_id: UUID) -> dict:
         """Activa un beneficio"""
-        # Verificar que beneficio existe
-        await self.get_beneficio_by_id(beneficio_id)
-        
-        # Activar
-        return await self.repository.update(
+        updated = await self.repository.update(
             beneficio_id=beneficio_id,
             is_active=True
         )
+        if updated is None:
+            # Sin cambio de nombre, la única causa posible es que no exista
+            await self.get_beneficio_by_id(beneficio_id)
+        return updated
     
     async def list_beneficios(
         self,
@@ -157,7 +155,7 @@ class BeneficioService:
         )
         
         total = await self.repository.count_beneficios(is_active=is_active)
-        total_pages = ceil(total / size) if total > 0 else 0
+        total_pages = -(-total // size)
         
         return {
             "beneficios": beneficios,
@@ -179,9 +177,13 @@ class BeneficioService:
         Returns:
             dict con keys: beneficios, total, page, size, total_pages
         """
-        # Validar query
-        if not query or len(query.strip()) < 2:
+        # Validar query; solo se crea una copia con strip() si hay espacios en los extremos
+        if not query or len(query) < 2:
             raise ValidationError("La búsqueda debe tener al menos 2 caracteres")
+        if query[0].isspace() or query[-1].isspace():
+            query = query.strip()
+            if len(query) < 2:
+                raise ValidationError("La búsqueda debe tener al menos 2 caracteres")
         
         # Calcular offset
         skip = (page - 1) * size
@@ -194,7 +196,7 @@ class BeneficioService:
         )
         
         total = await self.repository.count_search(search_term=query)
-        total_pages = ceil(total / size) if total > 0 else 0
+        total_pages = -(-total // size)
         
         return {
             "beneficios": beneficios,
@@ -1,20 +1,23 @@
 """Servicio de negocio para canjes de puntos - Consolida lógica de aplicación"""
 
 from datetime import datetime, timezone
-from math import ceil
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from uuid import UUID
 
 from app.core.exceptions import NotFoundError, ValidationError, ConflictError
 from app.repositories.canje_repository import CanjeRepository
 from app.repositories.user_repository import UserRepository
 from app.repositories.beneficio_repository import BeneficioRepository
-from app.services.email_service import EmailService
+
+# Estados permitidos para un canje
+ESTADOS_VALIDOS = frozenset({"ACTIVO", "USADO", "CANCELADO", "VENCIDO"})
 
 
 class CanjeService:
     """Servicio de negocio para operaciones de canjes de puntos"""
     
+    __slots__ = ("canje_repository", "user_repository", "beneficio_repository")
+    
     def __init__(
         self,
         canje_repository: CanjeRepository,
@@ -150,7 +153,7 @@ class CanjeService:
         
         return canje
 
-    async def send_canje_notification(
+    async def build_canje_notification(
         self,
         user_id: int,
         beneficio_id: UUID,
@@ -160,16 +163,21 @@ class CanjeService:
         jornada: Optional[str] = None,
         comentarios: Optional[str] = None,
         puntos_restantes: Optional[int] = None
-    ) -> None:
-        """Construye el contexto y envía el correo de notificación de canje."""
+    ) -> Optional[Tuple[str, dict]]:
+        """
+        Construye el destinatario y el contexto del correo de notificación de canje
+        
+        Las lecturas se hacen aquí, con la sesión de la petición; el envío (bloqueante) lo hace
+        el llamador fuera de la ruta de respuesta. Retorna None si falta el usuario o el beneficio.
+        """
         # Obtener usuario por user_id (ID externo)
         user = await self.user_repository.get_by_user_id(user_id)
         if not user:
-            return
+            return None
         # Obtener beneficio
         beneficio = await self.beneficio_repository.get_by_id(beneficio_id)
         if not beneficio:
-            return
+            return None
         context = {
             "nombre_colaborador": user.get("first_name", ""),
             "nombre_beneficio": beneficio.get("beneficio", ""),
@@ -182,10 +190,7 @@ class CanjeService:
             "jornada": jornada,
             "comentarios": comentarios,
         }
-        EmailService.send_benefit_notification(
-            recipient_email=user.get("email", ""),
-            context=context
-        )
+        return user.get("email", ""), context
     
     async def get_canje_by_id(self, canje_id: UUID) -> dict:
         """Obtiene un canje por ID"""
@@ -215,27 +220,15 @@ class CanjeService:
         # Calcular offset
         skip = (page - 1) * size
         
-        # Obtener canjes y total
-        canjes = await self.canje_repository.get_by_user_id(
+        # Obtener canjes, total y puntos restantes en una sola consulta
+        canjes, total = await self.canje_repository.get_by_user_id(
             user_id=user_id,
             skip=skip,
             limit=size,
             estado=estado
         )
         
-        total = await self.canje_repository.count_by_user_id(
-            user_id=user_id,
-            estado=estado
-        )
-        
-        total_pages = ceil(total / size) if total > 0 else 0
-        
-        # Agregar puntos restantes a cada canje
-        user = await self.user_repository.get_by_user_id(user_id)
-        puntos_actuales = user.get("puntos", 0) if user else 0
-        
-        for canje in canjes:
-            canje["puntos_restantes"] = puntos_actuales
+        total_pages = -(-total // size)
         
         return {
             "canjes": canjes,
@@ -262,8 +255,8 @@ class CanjeService:
         # Calcular offset
         skip = (page - 1) * size
         
-        # Obtener canjes y total
-        canjes = await self.canje_repository.list_canjes(
+        # Obtener canjes, total y puntos restantes de cada usuario en una sola consulta
+        canjes, total = await self.canje_repository.list_canjes(
             skip=skip,
             limit=size,
             user_id=user_id,
@@ -271,17 +264,7 @@ class CanjeService:
             estado=estado
         )
         
-        total = await self.canje_repository.count_canjes(
-            user_id=user_id,
-            beneficio_id=beneficio_id,
-            estado=estado
-        )
-        
-        total_pages = ceil(total / size) if total > 0 else 0
-        
-        # Agregar puntos restantes (0 por defecto si no se puede obtener)
-        for canje in canjes:
-            canje["puntos_restantes"] = 0
+        total_pages = -(-total // size)
         
         return {
             "canjes": canjes,
@@ -291,6 +274,26 @@ class CanjeService:
             "total_pages": total_pages
         }
     
+    async def list_canjes_stream(
+        self,
+        page: int = 1,
+        size: int = 10,
+        user_id: Optional[int] = None,
+        beneficio_id: Optional[UUID] = None,
+        estado: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """Recorre los canjes de una página a medida que llegan desde la base de datos"""
+        skip = (page - 1) * size
+        
+        async for canje in self.canje_repository.stream_canjes(
+            skip=skip,
+            limit=size,
+            user_id=user_id,
+            beneficio_id=beneficio_id,
+            estado=estado
+        ):
+            yield canje
+    
     async def actualizar_estado_canje(
         self,
         canje_id: UUID,
@@ -302,16 +305,15 @@ class CanjeService:
         
         Estados permitidos: ACTIVO, USADO, CANCELADO, VENCIDO
         """
-        # Validar que el canje existe
-        canje = await self.get_canje_by_id(canje_id)
-        
-        # Validar estado
-        estados_validos = ["ACTIVO", "USADO", "CANCELADO", "VENCIDO"]
-        if estado not in estados_validos:
+        # Validar estado antes de ir a la base de datos
+        if estado not in ESTADOS_VALIDOS:
             raise ValidationError(
-                f"Estado inválido. Estados permitidos: {', '.join(estados_validos)}"
+                "Estado inválido. Estados permitidos: ACTIVO, USADO, CANCELADO, VENCIDO"
             )
         
+        # Validar que el canje existe
+        canje = await self.get_canje_by_id(canje_id)
+        
         # Si se cancela un canje ACTIVO, devolver los puntos al usuario
         if estado == "CANCELADO" and canje["estado"] == "ACTIVO":
             user = await self.user_repository.get_by_user_id(canje["user_id"])
@@ -5,6 +5,9 @@ from email.mime.text import MIMEText
 from typing import List, Union
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class EmailService:
@@ -53,10 +56,13 @@ class EmailService:
                 server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
                 server.send_message(msg)
 
-            print(f"✅ Correo enviado a: {', '.join(recipients)}")
+            logger.info("Correo enviado", extra={"extra_data": {"recipients": recipients, "subject": subject}})
 
         except smtplib.SMTPException as e:
-            print(f"❌ Error al enviar correo: {e}")
+            logger.error(
+                "Error al enviar correo",
+                extra={"extra_data": {"recipients": recipients, "subject": subject, "error": str(e)}}
+            )
             raise e
 
     @staticmethod
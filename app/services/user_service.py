@@ -1,6 +1,5 @@
 """Servicio de negocio para usuarios - Consolida toda la lógica de aplicación"""
 
-from math import ceil
 from typing import List, Optional
 from uuid import UUID
 
@@ -13,6 +12,8 @@ from app.repositories.user_repository import UserRepository
 class UserService:
     """Servicio de negocio para operaciones de usuarios"""
     
+    __slots__ = ("repository",)
+    
     def __init__(self, repository: UserRepository):
         self.repository = repository
     
@@ -44,31 +45,27 @@ class UserService:
         if not roles:
             raise ValidationError("Usuario debe tener al menos un rol")
         
-        # Verificar email único
-        exists = await self.repository.exists_by_email(email)
-        if exists:
-            raise ConflictError(f"Ya existe un usuario con el email {email}")
-        
         # Normalizar datos
         email = email.lower().strip()
         first_name = first_name.strip().title()
         last_name = last_name.strip().title()
         
-        # Crear usuario
-        user = await self.repository.create(
+        # Crear usuario; el email único se verifica en el mismo INSERT (ON CONFLICT)
+        user = await self.repository.create_if_not_exists(
             email=email,
             first_name=first_name,
             last_name=last_name,
             roles=roles,
             puntos=0
         )
+        if user is None:
+            raise ConflictError(f"Ya existe un usuario con el email {email}")
         
         return user
     
     async def get_user_by_id(self, user_id: int) -> dict:
         """Obtiene un usuario por ID"""
         user = await self.repository.get_by_id(user_id)
-        print(user)
         if not user:
             raise NotFoundError(f"Usuario con ID {user_id} no encontrado")
         return user
@@ -213,56 +210,75 @@ class UserService:
         page: int = 1,
         size: int = 10,
         email: Optional[str] = None,
-        is_active: Optional[bool] = None
+        is_active: Optional[bool] = None,
+        after_id: Optional[int] = None,
+        search: Optional[str] = None
     ) -> dict:
         """
         Lista usuarios con paginación y filtros
         
+        Si se indica `after_id` se pagina por keyset (user_id ascendente) y `page` se ignora;
+        `next_cursor` es el valor a enviar como `after_id` para la página siguiente. En ese modo
+        no se cuenta el total (`total` y `total_pages` son None).
+        
         Returns:
-            dict con keys: users, total, page, size, total_pages
+            dict con keys: users, total, page, size, total_pages, next_cursor
         """
-        # Calcular offset
-        skip = (page - 1) * size
-        
-        # Obtener usuarios y total
-        users = await self.repository.list_users(
-            skip=skip,
-            limit=size,
-            email=email,
-            is_active=is_active
-        )
-        
-        total = await self.repository.count_users(
-            email=email,
-            is_active=is_active
-        )
+        next_cursor = None
+        
+        if after_id is None:
+            users, total = await self.repository.list_users(
+                skip=(page - 1) * size,
+                limit=size,
+                email=email,
+                is_active=is_active,
+                search=search
+            )
+        else:
+            # Se pide una fila extra solo para saber si hay página siguiente
+            users, total = await self.repository.list_users(
+                limit=size + 1,
+                email=email,
+                is_active=is_active,
+                after_id=after_id,
+                search=search
+            )
+            if len(users) > size:
+                users = users[:size]
+                next_cursor = users[-1]["user_id"]
         
-        total_pages = ceil(total / size) if total > 0 else 0
+        total_pages = -(-total // size) if total is not None else None
         
         return {
             "users": users,
             "total": total,
             "page": page,
             "size": size,
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "next_cursor": next_cursor
         }
     
     async def search_users(
         self,
         query: str,
         page: int = 1,
-        size: int = 10
+        size: int = 10,
+        after_id: Optional[int] = None
     ) -> dict:
         """
-        Busca usuarios por email
+        Busca usuarios por email, nombre o apellido
+        
+        Varias palabras se combinan con AND ("ana perez" encuentra a Ana Pérez por nombre
+        y apellido); el filtrado y la paginación se hacen en la base de datos.
         
         Returns:
-            dict con keys: users, total, page, size, total_pages
+            dict con keys: users, total, page, size, total_pages, next_cursor
         """
         return await self.list_users(
             page=page,
             size=size,
-            email=query
+            after_id=after_id,
+            search=query
         )
     
     async def add_puntos(self, user_id: UUID, puntos: int) -> dict:
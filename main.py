@@ -3,8 +3,9 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -13,7 +14,8 @@ from fastapi.templating import Jinja2Templates
 
 from app.core.config import settings
 from app.core.logger import setup_logging
-from app.core.database import create_tables
+from app.core.database import create_tables, engine, warmup_pool
+from app.core.exceptions import BaseAppException
 
 import sys
 from pathlib import Path
@@ -45,9 +47,10 @@ async def lifespan(app: FastAPI):
     # Startup
     setup_logging()
     await create_tables()
+    await warmup_pool()
     yield
     # Shutdown
-    pass
+    await engine.dispose()
 
 
 # Crear aplicación FastAPI
@@ -58,6 +61,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -111,7 +115,8 @@ async def validation_exception_handler(request, exc: RequestValidationError):
             {
                 "field": field or "",
                 "message": message,
-                "detail": error
+                # jsonable_encoder: el ctx de los errores de validadores trae la excepción original
+                "detail": jsonable_encoder(error)
             }
         )
 
@@ -123,6 +128,15 @@ async def validation_exception_handler(request, exc: RequestValidationError):
         }
     )
 
+
+@app.exception_handler(BaseAppException)
+async def app_exception_handler(request, exc: BaseAppException):
+    """Traduce las excepciones de la aplicación a su respuesta HTTP (mismo formato que HTTPException)"""
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={"detail": {"message": exc.message, "error_code": exc.error_code}}
+    )
+
 # Registrar routers
 app.include_router(health_router)
 app.include_router(user_router, prefix=settings.API_V1_PREFIX)
@@ -0,0 +1,16 @@
+-- Migración 004: Índices trigram para búsquedas por texto
+-- Fecha: 2026-10-16
+-- Descripción: Permite que los filtros ILIKE '%termino%' de beneficios y usuarios usen índice
+--              en lugar de recorrer la tabla completa
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Búsqueda de beneficios (nombre y detalle)
+CREATE INDEX IF NOT EXISTS idx_beneficios_beneficio_trgm
+    ON puntos_flesan.beneficios USING GIN (beneficio gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_beneficios_detalle_trgm
+    ON puntos_flesan.beneficios USING GIN (detalle gin_trgm_ops);
+
+-- Búsqueda/filtro de usuarios por email
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm
+    ON puntos_flesan.users USING GIN (email gin_trgm_ops);
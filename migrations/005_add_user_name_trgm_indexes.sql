@@ -0,0 +1,11 @@
+-- Migración 005: Índices trigram para la búsqueda de usuarios por nombre
+-- Fecha: 2026-10-16
+-- Descripción: La búsqueda de usuarios compara cada palabra con email, nombre y apellido
+--              (ILIKE '%palabra%'); el índice de email ya existe desde la migración 004
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_users_first_name_trgm
+    ON puntos_flesan.users USING GIN (first_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_last_name_trgm
+    ON puntos_flesan.users USING GIN (last_name gin_trgm_ops);
@@ -1,18 +1,28 @@
 """Configuración global para tests con pytest"""
 
 import asyncio
+import os
 from typing import AsyncGenerator, Generator
 from uuid import uuid4
 
+# Valores mínimos para construir Settings sin un .env real (no se conecta a ningún servicio)
+for _name in (
+    "DB_HOST", "DB_NAME", "DB_USER", "DB_PASSWORD",
+    "DB_HOST_DW", "DB_NAME_DW", "DB_USER_DW", "DB_PASSWORD_DW",
+    "AUTH_JWKS_URL", "AUTH_AUDIENCE", "AUTH_ISSUER", "SECRET_KEY",
+    "SMTP_USER", "SMTP_PASSWORD",
+):
+    os.environ.setdefault(_name, "test")
+os.environ.setdefault("ENVIRONMENT", "development")
+
 import pytest
 import pytest_asyncio
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.core.config import settings
-from app.infrastructure.db.session import Base
-from app.main import app
+from app.core.database import Base
+from main import app
 
 
 # Configurar event loop para tests async
@@ -69,7 +79,7 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
 @pytest_asyncio.fixture
 async def client() -> AsyncGenerator[AsyncClient, None]:
     """Fixture para cliente HTTP de test"""
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
 
 
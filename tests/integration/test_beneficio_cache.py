@@ -0,0 +1,182 @@
+"""Tests de integración de la caché Redis de beneficios (escritura seguida de lectura)"""
+
+import importlib
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Dict, Optional
+from uuid import UUID, uuid4
+
+import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis
+from httpx import ASGITransport, AsyncClient
+
+from app.core.cache import cached, get_redis
+from app.core.database import get_db
+from main import app
+
+# El paquete routers re-exporta el APIRouter con el mismo nombre; se necesita el módulo
+beneficio_router = importlib.import_module("app.api.routers.beneficio_router")
+
+
+class FakeStore:
+    """Tabla de beneficios en memoria: las escrituras solo son visibles tras el commit"""
+
+    def __init__(self) -> None:
+        self.committed: Dict[UUID, dict] = {}
+        self.pending: Dict[UUID, dict] = {}
+
+    def commit(self) -> None:
+        self.committed.update(self.pending)
+        self.pending.clear()
+
+
+class FakeSession:
+    """Sesión mínima con la interfaz que usan get_db y los endpoints"""
+
+    def __init__(self, store: FakeStore) -> None:
+        self.store = store
+
+    async def commit(self) -> None:
+        self.store.commit()
+
+    async def rollback(self) -> None:
+        self.store.pending.clear()
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeBeneficioService:
+    """Servicio que lee lo confirmado y deja las escrituras pendientes hasta el commit"""
+
+    def __init__(self, store: FakeStore) -> None:
+        self.store = store
+
+    async def get_beneficio_by_id(self, beneficio_id: UUID) -> dict:
+        return dict(self.store.committed[beneficio_id])
+
+    async def update_beneficio(self, beneficio_id: UUID, **fields: Optional[object]) -> dict:
+        beneficio = {**self.store.committed[beneficio_id]}
+        beneficio.update({k: v for k, v in fields.items() if v is not None})
+        beneficio["updated_at"] = datetime.now(timezone.utc)
+        self.store.pending[beneficio_id] = beneficio
+        return dict(beneficio)
+
+    async def deactivate_beneficio(self, beneficio_id: UUID) -> dict:
+        return await self.update_beneficio(beneficio_id, is_active=False)
+
+    async def list_beneficios(self, page: int = 1, size: int = 10, is_active: Optional[bool] = None) -> dict:
+        beneficios = [
+            dict(b) for b in self.store.committed.values()
+            if is_active is None or b["is_active"] == is_active
+        ]
+        return {
+            "beneficios": beneficios,
+            "total": len(beneficios),
+            "page": page,
+            "size": size,
+            "total_pages": 1
+        }
+
+
+@pytest.fixture
+def store() -> FakeStore:
+    """Tabla con un beneficio activo ya confirmado"""
+    store = FakeStore()
+    beneficio_id = uuid4()
+    store.committed[beneficio_id] = {
+        "id": beneficio_id,
+        "imagen": "/static/beneficios/gym.png",
+        "beneficio": "Gimnasio",
+        "detalle": "Un mes de gimnasio",
+        "valor": 100,
+        "requiresJourney": False,
+        "is_active": True,
+        "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "updated_at": None
+    }
+    return store
+
+
+@pytest_asyncio.fixture
+async def redis() -> AsyncGenerator[FakeAsyncRedis, None]:
+    """Redis en memoria"""
+    client = FakeAsyncRedis()
+    yield client
+    await client.aclose()
+
+
+@pytest_asyncio.fixture
+async def client(store: FakeStore, redis: FakeAsyncRedis) -> AsyncGenerator[AsyncClient, None]:
+    """Cliente HTTP con la base de datos y Redis reemplazados por dobles en memoria"""
+    async def _get_db():
+        # Igual que get_db: confirma al cerrar el request
+        session = FakeSession(store)
+        yield session
+        await session.commit()
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_redis] = lambda: redis
+    app.dependency_overrides[beneficio_router.get_beneficio_service] = lambda: FakeBeneficioService(store)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def concurrent_read_after_invalidate(monkeypatch, store: FakeStore, redis: FakeAsyncRedis) -> None:
+    """Simula un GET de otro worker que llega justo después de invalidar y vuelve a cachear"""
+    invalidate = beneficio_router.invalidate
+    service = FakeBeneficioService(store)
+
+    async def _invalidate_then_read(cache, keys=(), patterns=()):
+        await invalidate(cache, keys=keys, patterns=patterns)
+        for beneficio_id in store.committed:
+            await cached(
+                redis,
+                f"ben:id:{beneficio_id}",
+                beneficio_router.BENEFICIO_CACHE_TTL,
+                lambda: service.get_beneficio_by_id(beneficio_id)
+            )
+
+    monkeypatch.setattr(beneficio_router, "invalidate", _invalidate_then_read)
+
+
+class TestBeneficioCache:
+    """Una escritura nunca debe dejar en caché la versión anterior"""
+
+    @pytest.mark.asyncio
+    async def test_read_after_update_returns_fresh_data(
+        self,
+        client: AsyncClient,
+        store: FakeStore,
+        concurrent_read_after_invalidate
+    ):
+        """Test leer tras actualizar retorna el valor nuevo aunque otra lectura recachee en medio"""
+        beneficio_id = next(iter(store.committed))
+
+        response = await client.get(f"/api/v1/beneficios/{beneficio_id}")
+        assert response.status_code == 200
+        assert response.json()["valor"] == 100
+
+        response = await client.put(f"/api/v1/beneficios/{beneficio_id}", data={"valor": "250"})
+        assert response.status_code == 200
+
+        response = await client.get(f"/api/v1/beneficios/{beneficio_id}")
+        assert response.status_code == 200
+        assert response.json()["valor"] == 250
+
+    @pytest.mark.asyncio
+    async def test_list_after_deactivate_excludes_beneficio(self, client: AsyncClient, store: FakeStore):
+        """Test el listado de activos cacheado se invalida al desactivar"""
+        beneficio_id = next(iter(store.committed))
+
+        response = await client.get("/api/v1/beneficios/", params={"is_active": "true"})
+        assert response.json()["total"] == 1
+
+        response = await client.put(f"/api/v1/beneficios/{beneficio_id}/desactivar")
+        assert response.status_code == 200
+        assert response.json()["is_active"] is False
+
+        response = await client.get("/api/v1/beneficios/", params={"is_active": "true"})
+        assert response.json()["total"] == 0
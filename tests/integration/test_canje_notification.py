@@ -0,0 +1,138 @@
+"""Tests de integración del canje y su notificación por correo en segundo plano"""
+
+import importlib
+import smtplib
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Dict, Optional, Tuple
+from uuid import UUID, uuid4
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.core.database import get_db
+from app.services.email_service import EmailService
+from main import app
+
+# El paquete routers re-exporta el APIRouter con el mismo nombre; se necesita el módulo
+canje_router = importlib.import_module("app.api.routers.canje_router")
+
+
+class FakeSession:
+    """Sesión mínima: las escrituras pendientes solo quedan confirmadas tras commit()"""
+
+    def __init__(self) -> None:
+        self.committed: Dict[UUID, dict] = {}
+        self.pending: Dict[UUID, dict] = {}
+
+    async def commit(self) -> None:
+        self.committed.update(self.pending)
+        self.pending.clear()
+
+    async def rollback(self) -> None:
+        self.pending.clear()
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeCanjeService:
+    """Servicio que registra el canje en la sesión sin confirmarlo"""
+
+    def __init__(self, session: FakeSession) -> None:
+        self.session = session
+
+    async def crear_canje(self, user_id: int, beneficio_id: UUID, puntos_utilizar: int, **fields) -> dict:
+        canje = {
+            "id": uuid4(),
+            "user_id": user_id,
+            "beneficio_id": beneficio_id,
+            "puntos_canjeados": puntos_utilizar,
+            "fecha_canje": fields["fecha_canje"],
+            "fecha_uso": fields["fecha_uso"],
+            "jornada": fields.get("jornada"),
+            "estado": "ACTIVO",
+            "observaciones": fields.get("observaciones"),
+            "puntos_restantes": 400,
+            "created_at": datetime.now(timezone.utc),
+            "updated_at": None
+        }
+        self.session.pending[canje["id"]] = canje
+        return dict(canje)
+
+    async def build_canje_notification(self, user_id: int, **fields) -> Optional[Tuple[str, dict]]:
+        return "colaborador@flesan.cl", {"nombre_beneficio": "Día libre"}
+
+
+@pytest.fixture
+def session() -> FakeSession:
+    return FakeSession()
+
+
+@pytest_asyncio.fixture
+async def client(session: FakeSession) -> AsyncGenerator[AsyncClient, None]:
+    """Cliente HTTP con la base de datos reemplazada por una sesión en memoria"""
+    async def _get_db():
+        # Igual que get_db: confirma al cerrar el request y revierte si algo falla
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[canje_router.get_canje_service] = lambda: FakeCanjeService(session)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+
+
+class TestCrearCanjeNotification:
+    """El canje confirmado al cliente no puede depender del envío del correo"""
+
+    @pytest.mark.asyncio
+    async def test_canje_is_committed_when_email_fails(
+        self,
+        client: AsyncClient,
+        session: FakeSession,
+        monkeypatch
+    ):
+        """Test si el SMTP falla el canje igual queda confirmado y se responde 201"""
+        sent = []
+
+        def _failing_send(recipient_email: str, context: dict) -> None:
+            sent.append(recipient_email)
+            raise smtplib.SMTPException("SMTP no disponible")
+
+        monkeypatch.setattr(EmailService, "send_benefit_notification", staticmethod(_failing_send))
+
+        response = await client.post("/api/v1/canjes/", json={
+            "user_id": 6070,
+            "beneficio_id": str(uuid4()),
+            "puntos_utilizar": 100,
+            "fecha_canje": "2025-01-24T10:00:00",
+            "fecha_uso": "2025-02-01T10:00:00"
+        })
+
+        assert response.status_code == 201
+        assert sent == ["colaborador@flesan.cl"]
+        assert UUID(response.json()["id"]) in session.committed
+
+
+class TestCrearCanjeValidation:
+    """Los errores de validación del canje apuntan al campo que los produce"""
+
+    @pytest.mark.asyncio
+    async def test_fecha_uso_before_fecha_canje_points_at_fecha_uso(self, client: AsyncClient):
+        """Test una fecha de uso anterior al canje retorna 422 en el campo fecha_uso"""
+        response = await client.post("/api/v1/canjes/", json={
+            "user_id": 6070,
+            "beneficio_id": str(uuid4()),
+            "puntos_utilizar": 100,
+            "fecha_canje": "2025-02-01T10:00:00",
+            "fecha_uso": "2025-01-24T10:00:00"
+        })
+
+        assert response.status_code == 422
+        assert [e["field"] for e in response.json()["errors"]] == ["fecha_uso"]